@@ -4,7 +4,7 @@ from pathlib import Path
 
 import nltk
 from whoosh.analysis import LowercaseFilter, RegexTokenizer
-from whoosh.fields import ID, KEYWORD, NUMERIC, TEXT, Schema
+from whoosh.fields import ID, KEYWORD, NUMERIC, STORED, TEXT, Schema
 
 # Defines the main location of the application
 GLOBAL_WORKING_PATH = str(Path(__file__).resolve().parents[1])
@@ -46,7 +46,10 @@ DATA_INDEXING_WHOOSH_SCHEME = Schema(
 
     speech_text=TEXT(analyzer=DATA_INDEXING_WHOOSH_ANALYZER, stored=True),
     important_words=KEYWORD(stored=True, scorable=True),
-    important_concepts=KEYWORD(stored=True, scorable=True)
+    important_concepts=KEYWORD(stored=True, scorable=True),
+
+    # start frame and end frame of every word of the speech text (flat list)
+    token_timings=STORED
 )
 
 # Defines the location of the JSON file after the information extraction phase
@@ -234,6 +237,14 @@ INFORMATION_EXTRACTION_PATH_REPLACE_DICT = {'\\': ' ', '.': ' ', '_': ' ', '-':
 # Defines the location of the data set (JSON file) after the speech recognition process
 SPEECH_RECOGNITION_JSON_STORAGE_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\speech_database_storage.json"
 
+# Defines the location of the recognition log (JSON lines) of the recognized audio segments which are not stored in the
+# data set yet
+SPEECH_RECOGNITION_LOG_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\speech_recognition_log.json"
+
+# Defines the location of the cache (JSON lines) of the decoder output of all audio segments, the cache is keyed by
+# the raw audio data and the model of sphinx
+SPEECH_RECOGNITION_SEGMENT_CACHE_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\speech_segment_cache.json"
+
 # Defines the Hidden Markov Model of the speech recognition framework sphinx
 SPEECH_RECOGNITION_POCKET_SPHINX_HMM = GLOBAL_WORKING_PATH + \
                                        r"\server\static\sphinx_model\model_parameters\voxforge.cd_ptm_5000"
@@ -244,11 +255,31 @@ SPEECH_RECOGNITION_POCKET_SPHINX_LM = GLOBAL_WORKING_PATH + r"\server\static\sph
 # Defines the Dictionary of the speech recognition framework sphinx
 SPEECH_RECOGNITION_POCKET_SPHINX_DICT = GLOBAL_WORKING_PATH + r"\server\static\sphinx_model\etc\voxforge.dic"
 
-# Defines a list of parameter of the framework sphinx in the speech recognition process
+# Defines a list of parameter of the framework sphinx in the speech recognition process, the model files are mapped
+# into memory (mmap), so all processes of the parallel speech recognition share them
 SPEECH_RECOGNITION_POCKET_SPHINX_CONFIG = {
     'hmm': SPEECH_RECOGNITION_POCKET_SPHINX_HMM,
     'lm': SPEECH_RECOGNITION_POCKET_SPHINX_LM,
     'dict': SPEECH_RECOGNITION_POCKET_SPHINX_DICT,
+    'mmap': True,
+}
+
+# Defines the model folder of the optional speech recognition framework Vosk
+SPEECH_RECOGNITION_VOSK_MODEL = GLOBAL_WORKING_PATH + r"\server\static\vosk_model"
+
+# Defines a list of parameter of the framework Vosk in the speech recognition process
+SPEECH_RECOGNITION_VOSK_CONFIG = {
+    'model': SPEECH_RECOGNITION_VOSK_MODEL,
+    'sample_rate': 16000,
+}
+
+# Defines the speech recognition framework (backend) of the speech recognition process (options: pocketsphinx, vosk)
+SPEECH_RECOGNITION_BACKEND = 'pocketsphinx'
+
+# Defines the parameters of all speech recognition frameworks (backends) of the speech recognition process
+SPEECH_RECOGNITION_BACKEND_CONFIGS = {
+    'pocketsphinx': SPEECH_RECOGNITION_POCKET_SPHINX_CONFIG,
+    'vosk': SPEECH_RECOGNITION_VOSK_CONFIG,
 }
 
 # Defines the first probability threshold in filtering process of wrong recognized words
@@ -260,11 +291,24 @@ SPEECH_RECOGNITION_SECOND_PROBABILITY_THRESHOLD = - 14000
 # Defines the maximum number of audio files in the speech recognition process
 SPEECH_RECOGNITION_MAX_FILES = GLOBAL_MAX_FILES
 
-# Defines the number of audio files which are processed in one processing step in the speech recognition process
-SPEECH_RECOGNITION_CALCULATION_BATCH_NUMBER = 25
+# Defines the number of recognized audio segments after which the recognition log is written to the hard disc (fsync)
+SPEECH_RECOGNITION_LOG_SYNC_PARTS = 25
 
 # Defines the number of cores of the parallel speech recognition process
-SPEECH_RECOGNITION_CALCULATION_CORES = multiprocessing.cpu_count() - 1
+SPEECH_RECOGNITION_CALCULATION_CORES = max(1, multiprocessing.cpu_count() - 1)
+
+# Defines the maximum number of audio segments which wait for a free core in the speech recognition process
+SPEECH_RECOGNITION_MAX_PENDING_PARTS = 4 * SPEECH_RECOGNITION_CALCULATION_CORES
+
+# Defines the number of frames per second of the word timings of the speech recognition (frames of 10 milliseconds)
+SPEECH_RECOGNITION_FRAME_RATE = 100
+
+# Defines the number of bytes of raw audio data which are passed to sphinx at the same time (8 seconds of audio data)
+SPEECH_RECOGNITION_RAW_BUFFER_SIZE = 256 * 1024
+
+# Defines if the speech of new audio files is recognized directly after their conversion in the same process
+# (options: 'separate', 'fused')
+SPEECH_RECOGNITION_MODE = 'separate'
 
 # Defines a char for wrongly recognized words of the speech recognition process
 SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM = 'u'
@@ -287,6 +331,11 @@ AUDIO_PROCESSING_MIN_DURATION = 8 * 1000
 # Defines the maximum duration of one audio file in the audio processing phase
 AUDIO_PROCESSING_MAX_DURATION = 60 * 60 * 1000
 
+# Defines the relative tolerance of the exact duration of the audio file header (wav files, MP3 files with Xing or VBRI
+# header) before audio files are rejected without decoding in the audio processing phase, estimated durations are
+# never rejected
+AUDIO_PROCESSING_PROBE_DURATION_TOLERANCE = 0.1
+
 # Defines the back up folder of all audio segments in the audio processing phase
 AUDIO_PROCESSING_STORAGE_DICTIONARY = GLOBAL_WORKING_PATH + r"\server\static\data\audio_database"
 
@@ -296,6 +345,10 @@ AUDIO_PROCESSING_RELATIVE_STORAGE_DICTIONARY = "/static/data/audio_database/"
 # Defines the location of the data set (JSON file) after the audio processing phase
 AUDIO_PROCESSING_STORAGE_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\audio_database_storage.json"
 
+# Defines the location of the conversion manifest (JSON file) with the checksums of all audio segments of the audio
+# processing phase
+AUDIO_PROCESSING_MANIFEST_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\audio_manifest_storage.json"
+
 # Defines the maximum number of audio files of the audio processing phase
 AUDIO_PROCESSING_MAX_FILES = GLOBAL_MAX_FILES
 
@@ -314,6 +367,62 @@ AUDIO_PROCESSING_FRAME_WIDTH = 2
 # Defines the audio format of the audio file of the audio processing phase
 AUDIO_PROCESSING_DEFAULT_FILE_TYPE = 'wav'
 
+# Defines the conversion backend of the audio processing phase ('pydub' loads the whole audio file into memory,
+# 'streaming' decodes and converts the audio file block by block, 'ffmpeg' decodes, resamples and mixes down the
+# audio file in one ffmpeg process, 'numpy' normalizes and splits the audio file with a NumPy sample buffer)
+AUDIO_PROCESSING_BACKEND = 'pydub'
+
+# Defines the storage of the audio segments of the audio processing phase ('wav' stores one wav file per audio segment,
+# 'container' stores all audio segments of an audio file in one container of raw audio data)
+AUDIO_PROCESSING_PART_STORE = 'wav'
+
+# Defines the maximum number of containers which are kept open by the part store of the audio processing phase
+AUDIO_PROCESSING_PART_STORE_CACHE_SIZE = 64
+
+# Defines the address of the web server which streams the audio segments of the containers as wav files
+AUDIO_PROCESSING_PART_URL = "/audio/"
+
+# Defines the audio format of the compressed audio segments for the web player ('mp3', 'opus' or None if the web
+# player uses the wav files)
+AUDIO_PROCESSING_PLAYBACK_FILE_TYPE = 'mp3'
+
+# Defines the bit rate of the compressed audio segments for the web player
+AUDIO_PROCESSING_PLAYBACK_BITRATE = '32k'
+
+# Defines the mime types of the audio formats of the web player
+AUDIO_PROCESSING_MIME_TYPES = {'wav': 'audio/wav', 'mp3': 'audio/mpeg', 'opus': 'audio/ogg'}
+
+# Defines the segmentation of the audio files of the numpy backend of the audio processing phase ('fixed' splits the
+# audio file into audio segments of the same duration, 'vad' cuts the audio file at silences and removes non speech)
+AUDIO_PROCESSING_SEGMENTATION = 'fixed'
+
+# Defines the duration of one analysis frame of the voice activity detection of the audio processing phase
+AUDIO_PROCESSING_VAD_FRAME_MILLISECONDS = 30
+
+# Defines the minimum sound volume (dBFS) of a speech frame of the voice activity detection
+AUDIO_PROCESSING_VAD_ENERGY_THRESHOLD = -45
+
+# Defines the maximum zero crossing rate of a speech frame of the voice activity detection (noise has higher rates)
+AUDIO_PROCESSING_VAD_ZERO_CROSSING_THRESHOLD = 0.35
+
+# Defines the minimum duration of a pause which separates two speech regions of the voice activity detection
+AUDIO_PROCESSING_VAD_MIN_SILENCE_MILLISECONDS = 1000
+
+# Defines the minimum duration of a speech region of the voice activity detection
+AUDIO_PROCESSING_VAD_MIN_SPEECH_MILLISECONDS = 500
+
+# Defines the additional duration before and after a speech region of the voice activity detection
+AUDIO_PROCESSING_VAD_PADDING_MILLISECONDS = 200
+
+# Defines the duration of one decoded audio block of the streaming backend of the audio processing phase
+AUDIO_PROCESSING_BLOCK_SIZE_MILLISECONDS = 1000
+
+# Defines the number of cores of the parallel audio processing phase
+AUDIO_PROCESSING_CALCULATION_CORES = max(1, multiprocessing.cpu_count() - 1)
+
+# Defines the number of converted audio files after which the parallel audio processing phase stores its results
+AUDIO_PROCESSING_CHECKPOINT_FILES = 100
+
 # Defines a correct list of audio format extensions of the data filtering phase
 DATA_FILTERING_SUPPORTED_FILE_TYPES = ['wav', 'mp3']
 
@@ -354,15 +463,68 @@ DATA_FILTERING_START_DICTIONARY = "D:\\"
 # Defines the maximum number of audio files of the data filtering phase
 DATA_FILTERING_MAX_FILES = GLOBAL_MAX_FILES
 
+# Defines the number of threads of the parallel file scan of the data filtering phase
+DATA_FILTERING_SCAN_THREADS = 16
+
+# Defines the number of audio files whose ID3 Tags are read in one processing step of the data filtering phase
+DATA_FILTERING_SCAN_BATCH_SIZE = 256
+
+# Defines the maximum size (bytes) of the ID3 Tag region of MP3 files which is read in the data filtering phase
+DATA_FILTERING_TAG_HEADER_BYTES = 256 * 1024
+
 # Defines the location of the data set (JSON file) after the file filtering phase
 DATA_FILTERING_STORAGE_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\file_database_storage.json"
 
+# Defines the waiting time (seconds) after the last file change before new audio files are processed
+DATA_FILTERING_WATCH_SETTLE_SECONDS = 10
+
+# Defines the maximum waiting time (seconds) after the first file change before new audio files are processed, even if
+# the file archive is not quiet (e.g. a running recording or a large copy)
+DATA_FILTERING_WATCH_MAX_BATCH_SECONDS = 2 * 60
+
+# Defines the time interval (seconds) of the periodic file scan, when inotify is not available
+DATA_FILTERING_WATCH_POLL_SECONDS = 5 * 60
+
+# Defines the number of ingestion machines which share the file scan of the data filtering phase (1 = no sharding)
+DATA_FILTERING_SHARD_NUMBER = 1
+
+# Defines the shard number (0 to DATA_FILTERING_SHARD_NUMBER - 1) of this ingestion machine
+DATA_FILTERING_SHARD_INDEX = 0
+
+# Defines the distribution of the file archive: 'path' (sub folders of the start folder) or 'hash' (hash value of the
+# file path, also balances archives with few large sub folders)
+DATA_FILTERING_SHARD_MODE = 'path'
+
+# Defines the location of the data set (JSON file) with the file attributes of all scanned audio files
+DATA_FILTERING_MANIFEST_FILE = GLOBAL_WORKING_PATH + r"\server\static\model\file_manifest_storage.json"
+
 # Defines the number of bytes for the calculation of the file id (hash value) of the file filtering phase
 DATA_FILTERING_MD5_HASH_BYTES = 8192 * 4
 
+# Defines the calculation of the file id: 'head' (first bytes), 'full' (whole file) or 'hybrid' (first bytes,
+# last bytes and file size). Changing the calculation changes all file ids of the data set
+DATA_FILTERING_FILE_ID_MODE = 'head'
+
+# Defines the hash algorithm of the file id: 'md5', 'blake2b' or 'xxhash' (BLAKE2b if xxhash is not installed)
+DATA_FILTERING_FILE_ID_ALGORITHM = 'md5'
+
+# Defines the buffer size (bytes) for reading whole audio files in the file id calculation
+DATA_FILTERING_HASH_BUFFER_BYTES = 1024 * 1024
+
+# Defines the number of threads which calculate the file ids of the file filtering phase
+DATA_FILTERING_HASH_THREADS = 4
+
 # Defines the back up folder of all audio files of the file filtering phase
 DATA_FILTERING_STORAGE_DICTIONARY = GLOBAL_WORKING_PATH + r"\server\static\data\file_database"
 
+# Defines the backup method of the audio files: 'copy', 'hardlink', 'reflink' or 'auto' (reflink, then copy)
+# Hard links and reflinks need the file archive and the backup folder on the same file system, otherwise the file is copied
+# A hard link shares the content with the original audio file: editing the original in place changes the backup too
+DATA_FILTERING_BACKUP_METHOD = 'copy'
+
+# Defines the number of threads which store the audio files in the backup folder of the file filtering phase
+DATA_FILTERING_BACKUP_THREADS = 4
+
 # Defines the relative path of the back up folder of all audio files
 DATA_FILTERING_RELATIVE_STORAGE_DICTIONARY = "/static/data/file_database/"
 
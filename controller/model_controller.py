@@ -8,6 +8,7 @@ from model.data_processing.data_filtering import DataFiltering
 from model.data_processing.data_indexing import DataIndexing
 from model.data_processing.information_extraction import InformationExtraction
 from model.data_processing.keyword_ranking import KeywordRanking
+from model.data_processing.part_store import PartStore
 from model.data_processing.similarity_computation import SimilarityComputation
 from model.data_processing.speech_recognition import SpeechRecognition
 
@@ -17,6 +18,7 @@ global_keyword_ranking = None
 global_search_history = None
 global_search_term = None
 global_concept_mapping = None
+global_part_store = None
 
 
 def re_init_global_concept_mapping():
@@ -120,6 +122,24 @@ def get_global_search_term():
         return global_search_term
 
 
+def get_global_part_store():
+    """Returns a new global part store reference.
+
+    """
+
+    global global_part_store
+
+    if not global_part_store:
+        part_store = PartStore(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY,
+                               configuration.AUDIO_PROCESSING_PART_STORE_CACHE_SIZE)
+
+        global_part_store = part_store
+
+        return global_part_store
+    else:
+        return global_part_store
+
+
 def get_global_search_history():
     """Returns a new global search history reference.
 
@@ -163,6 +183,60 @@ def update_concept_mapping():
     search_db.update_database(file_dict, audio_dict, text_dict)
 
 
+def update_speech_filtering():
+    """Filters the cached output of the speech recognition again, when the probability thresholds or the meta
+    information of sphinx changed. The audio segments are not decoded again.
+    The keywords, the concepts and the documents of the retrieval system of the changed audio files are extracted
+    again. The keyword ranking and word similarity are only updated by the full data processing.
+
+    """
+
+    speech_db = SpeechRecognition()
+    speech_db.load_database()
+    changed_file_id_list = speech_db.reapply_segment_cache()
+    speech_db.store_database()
+
+    if not changed_file_id_list:
+        return
+
+    file_db = DataFiltering()
+    file_db.load_database()
+    file_dict = file_db.get_database()
+
+    audio_db = AudioProcessing()
+    audio_db.load_database()
+    audio_dict = audio_db.get_database()
+
+    speech_dict = {file_id: file_info for file_id, file_info in speech_db.get_database().items() if
+                   file_id in changed_file_id_list}
+
+    # the extracted keywords of audio files in the database are not extracted again, so they are removed first
+    text_db = InformationExtraction()
+    text_db.load_database()
+    text_db.remove_files(changed_file_id_list)
+    text_db.update_database(speech_dict, audio_dict, file_dict)
+    text_db.store_database()
+    text_dict = {file_id: file_info for file_id, file_info in text_db.get_database().items() if
+                 file_id in speech_dict}
+
+    # audio segments which are no speech any more are removed from the retrieval system, too
+    search_db = DataIndexing()
+    search_db.remove_database(changed_file_id_list)
+    search_db.add_database(file_dict, audio_dict, text_dict)
+
+
+def _update_audio_database(audio_db, speech_db, file_dict):
+    """Converts the audio files to wav format.
+    In the fused data processing the speech of the audio files is recognized in the same step.
+
+    """
+
+    if configuration.SPEECH_RECOGNITION_MODE == 'fused':
+        speech_db.update_database_fused(audio_db, file_dict)
+    else:
+        audio_db.update_database_parallel(file_dict)
+
+
 def start_full_data_processing():
     """Searches for new audio files on the hard disc and adds them into the database.
 
@@ -175,16 +249,22 @@ def start_full_data_processing():
     file_db.store_database()
     file_dict = file_db.get_database()
 
-    # converts the audio files to wav format
+    # the data of modified audio files is removed before their new version is added
+    if file_db.get_replaced_file_ids():
+        remove_file_data(file_db.get_replaced_file_ids())
+
     audio_db = AudioProcessing()
     audio_db.load_database()
-    audio_db.update_database(file_dict)
+
+    speech_db = SpeechRecognition()
+    speech_db.load_database()
+
+    # converts the audio files to wav format
+    _update_audio_database(audio_db, speech_db, file_dict)
     audio_db.store_database()
     audio_dict = audio_db.get_database()
 
     # performs the parallel speech recognition
-    speech_db = SpeechRecognition()
-    speech_db.load_database()
     speech_db.update_database_parallel(audio_dict)
     speech_db.store_database()
     speech_dict = speech_db.get_database()
@@ -204,6 +284,126 @@ def start_full_data_processing():
     search_db.update_database(file_dict, audio_dict, text_dict)
 
 
+def start_shard_data_filtering():
+    """Searches for new audio files in the part of the hard disc of this ingestion machine (shard).
+    The audio files are stored in a partial data set.
+
+    """
+
+    file_db = DataFiltering()
+    file_db.load_shard_database()
+    file_db.update_database()
+    file_db.store_shard_database()
+
+
+def merge_shard_data_filtering():
+    """Merges the partial data sets of all ingestion machines (shards) into the data set.
+
+    """
+
+    file_db = DataFiltering()
+    file_db.load_database()
+    file_db.merge_shard_databases()
+    file_db.store_database()
+
+
+def start_incremental_data_processing(file_dict):
+    """Adds a small batch of new audio files into the database.
+    The keyword ranking and word similarity are only updated by the full data processing.
+
+    """
+
+    audio_db = AudioProcessing()
+    audio_db.load_database()
+
+    speech_db = SpeechRecognition()
+    speech_db.load_database()
+
+    # converts the new audio files to wav format
+    _update_audio_database(audio_db, speech_db, file_dict)
+    audio_db.store_database()
+    audio_dict = {file_id: file_info for file_id, file_info in audio_db.get_database().items() if
+                  file_id in file_dict}
+
+    # performs the parallel speech recognition
+    speech_db.update_database_parallel(audio_dict)
+    speech_db.store_database()
+    speech_dict = {file_id: file_info for file_id, file_info in speech_db.get_database().items() if
+                   file_id in audio_dict}
+
+    # extracts keywords and concepts form the recognized speech
+    text_db = InformationExtraction()
+    text_db.load_database()
+    text_db.update_database(speech_dict, audio_dict, file_dict)
+    text_db.store_database()
+    text_dict = {file_id: file_info for file_id, file_info in text_db.get_database().items() if
+                 file_id in speech_dict}
+
+    # adds the data entries to the existing database
+    search_db = DataIndexing()
+    search_db.add_database(file_dict, audio_dict, text_dict)
+
+
+def remove_file_data(file_id_list):
+    """Removes audio files which were replaced by a modified version from all following data processing steps.
+    The keyword ranking and word similarity are only updated by the full data processing.
+
+    """
+
+    audio_db = AudioProcessing()
+    audio_db.load_database()
+    audio_db.remove_files(file_id_list)
+    audio_db.store_database()
+
+    speech_db = SpeechRecognition()
+    speech_db.load_database()
+    speech_db.remove_files(file_id_list)
+    speech_db.store_database()
+
+    text_db = InformationExtraction()
+    text_db.load_database()
+    text_db.remove_files(file_id_list)
+    text_db.store_database()
+
+    # removes the audio segments from the existing database
+    search_db = DataIndexing()
+    search_db.remove_database(file_id_list)
+
+
+def start_watch_data_processing():
+    """Observes the hard disc and adds new audio files into the database as soon as they appear.
+
+    """
+
+    file_db = DataFiltering()
+    file_db.load_database()
+
+    known_file_ids = set(file_db.get_database())
+
+    # adds audio files which were copied to the hard disc before the observation started
+    file_db.update_database()
+    file_db.store_database()
+
+    if file_db.get_replaced_file_ids():
+        remove_file_data(file_db.get_replaced_file_ids())
+
+    new_file_dict = {file_id: file_info for file_id, file_info in file_db.get_database().items() if
+                     file_id not in known_file_ids}
+
+    if new_file_dict:
+        start_incremental_data_processing(new_file_dict)
+
+    for new_file_dict, replaced_file_ids in file_db.watch_database():
+        file_db.store_database()
+
+        # modified audio files are removed before their new version is added
+        if replaced_file_ids:
+            remove_file_data(replaced_file_ids)
+
+        if new_file_dict:
+            start_incremental_data_processing(new_file_dict)
+
+
 def get_similar_terms(term):
     """Returns a list of semantically related words.
 
@@ -349,3 +549,23 @@ def search_all_parameter(search_term, date_from, date_to, duration_from, duratio
     search_db.finalize_search()
 
     return search_result_list, search_result_number, found_concepts, found_concept_terms
+
+
+def get_audio_part_size(file_id, file_part):
+    """Returns the size of an audio segment of a container as wav file.
+
+    """
+
+    part_store = get_global_part_store()
+
+    return part_store.get_wave_size(file_id, file_part)
+
+
+def get_audio_part_range(file_id, file_part, start, stop):
+    """Returns a byte range of an audio segment of a container as wav file.
+
+    """
+
+    part_store = get_global_part_store()
+
+    return part_store.read_wave_range(file_id, file_part, start, stop)
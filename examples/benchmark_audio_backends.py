@@ -0,0 +1,91 @@
+import concurrent.futures
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import types
+import wave
+
+# the peak memory is only measured on Unix systems
+resource: types.ModuleType | None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from campus_wave import configuration
+from model.data_processing.audio_processing import AudioProcessing
+
+
+def build_audio_file(file_path: str, duration_seconds: int) -> None:
+    """Creates a synthetic stereo wav file (44.1 kHz, 16 bit) with a quiet tone of 441 Hz."""
+
+    frame_rate = 44100
+
+    # one second of the tone, the tone repeats without a gap
+    frame_list = []
+
+    for index in range(frame_rate):
+        value = int(2000 * math.sin(2 * math.pi * 441 * index / frame_rate))
+        frame_list.append(struct.pack('<hh', value, value // 2))
+
+    second_data = b''.join(frame_list)
+
+    with wave.open(file_path, 'wb') as wave_file:
+        wave_file.setnchannels(2)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(frame_rate)
+
+        for _second in range(duration_seconds):
+            wave_file.writeframes(second_data)
+
+
+def convert_audio_file(backend: str, file_path: str, storage_path: str) -> tuple[float, int, int | None]:
+    """Converts the audio file with one backend in a fresh process.
+    Returns the seconds, the number of audio segments and the peak memory (KiB) of the process (None on Windows)."""
+
+    configuration.AUDIO_PROCESSING_BACKEND = backend
+    configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY = storage_path
+    configuration.AUDIO_PROCESSING_MAX_DURATION = 24 * 60 * 60 * 1000
+
+    start_time = time.perf_counter()
+    file_part_list = AudioProcessing()._convert_audio_file("benchmark", file_path, "wav")
+    seconds = time.perf_counter() - start_time
+
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+    return seconds, len(file_part_list or []), peak_memory
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as temporary_path:
+        if len(sys.argv) > 1:
+            file_path = sys.argv[1]
+        else:
+            file_path = os.path.join(temporary_path, "benchmark.wav")
+            build_audio_file(file_path, 20 * 60)
+
+        print(f"Audio file: {file_path} ({os.path.getsize(file_path) / 2 ** 20:.0f} MiB)")
+
+        for backend in ("pydub", "numpy", "streaming", "ffmpeg"):
+            storage_path = os.path.join(temporary_path, backend)
+            os.makedirs(storage_path)
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                seconds, part_number, peak_memory = executor.submit(convert_audio_file, backend, file_path,
+                                                                    storage_path).result()
+
+            if not part_number:
+                print(f"{backend}: conversion failed (is ffmpeg/ffprobe installed?)")
+                continue
+
+            memory_text = f", peak memory {peak_memory / 1024:.0f} MiB" if peak_memory is not None else ""
+
+            print(f"{backend}: {seconds:.2f}s, {part_number} parts{memory_text}")
+
+
+if __name__ == "__main__":
+    main()
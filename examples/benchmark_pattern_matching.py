@@ -0,0 +1,67 @@
+import random
+import sys
+import time
+
+from campus_wave import configuration
+from model.data_processing.pattern_matching import PatternMatching
+
+
+def build_path_corpus(path_number: int) -> list[str]:
+    """Creates a synthetic list of lower case file paths with some hits of the configured patterns."""
+
+    random_generator = random.Random(42)
+    pattern_list = (configuration.DATA_FILTERING_INCLUDED_FILE_NAMES
+                    + configuration.DATA_FILTERING_EXCLUDED_FILE_NAMES
+                    + configuration.DATA_FILTERING_EXCLUDED_FILE_PATHS)
+    word_list = ["archiv", "ressorts", "campus", "radio", "2014", "folge", "final", "neu", "backup", "daten"]
+
+    path_list = []
+
+    for _index in range(path_number):
+        path_parts = random_generator.choices(word_list, k=random_generator.randint(3, 7))
+
+        # roughly every fifth path contains one of the patterns
+        if random_generator.random() < 0.2:
+            path_parts.insert(random_generator.randrange(len(path_parts)), random_generator.choice(pattern_list))
+
+        path_list.append("d:\\" + "\\".join(path_parts).lower() + ".mp3")
+
+    return path_list
+
+
+def has_match_loop(text: str, pattern_list: list[str]) -> bool:
+    """The previous implementation of the data filtering phase: one str.find call per pattern."""
+
+    return any(text.find(pattern) > -1 for pattern in pattern_list)
+
+
+def main() -> None:
+    path_number = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path_list = build_path_corpus(path_number)
+
+    print(f"Synthetic corpus: {len(path_list)} paths")
+
+    for list_name in ("DATA_FILTERING_INCLUDED_FILE_NAMES", "DATA_FILTERING_EXCLUDED_FILE_NAMES",
+                      "DATA_FILTERING_EXCLUDED_FILE_PATHS"):
+        pattern_list = getattr(configuration, list_name)
+
+        start_time = time.perf_counter()
+        loop_result = [has_match_loop(path, pattern_list) for path in path_list]
+        loop_seconds = time.perf_counter() - start_time
+
+        matcher = PatternMatching(pattern_list)
+
+        start_time = time.perf_counter()
+        matcher_result = [matcher.has_match(path) for path in path_list]
+        matcher_seconds = time.perf_counter() - start_time
+
+        if loop_result != matcher_result:
+            raise SystemExit(f"{list_name}: results differ")
+
+        print(f"{list_name} ({len(pattern_list)} patterns, {sum(matcher_result)} hits): "
+              f"loop {loop_seconds:.2f}s, compiled {matcher_seconds:.2f}s, "
+              f"speedup {loop_seconds / matcher_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
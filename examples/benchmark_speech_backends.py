@@ -0,0 +1,84 @@
+import concurrent.futures
+import math
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+from campus_wave import configuration
+from model.data_processing.speech_backend import SPEECH_BACKENDS, create_speech_backend
+
+
+def build_audio_file(file_path: str, duration_seconds: int) -> None:
+    """Creates a synthetic mono wav file (16 kHz, 16 bit) with a gliding tone, used if no audio segments are given."""
+
+    frame_rate = 16000
+
+    frame_list = [struct.pack('<h', int(3000 * math.sin(2 * math.pi * (200 + index % frame_rate / 40) * index /
+                                                        frame_rate))) for index in range(frame_rate * duration_seconds)]
+
+    with wave.open(file_path, 'wb') as wave_file:
+        wave_file.setnchannels(1)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(frame_rate)
+        wave_file.writeframes(b''.join(frame_list))
+
+
+def read_audio_file(file_path: str) -> bytes:
+    """Returns the raw audio data of a wav file with the format of the audio processing (16 kHz, 16 bit, mono)."""
+
+    with wave.open(file_path, 'rb') as wave_file:
+        if (wave_file.getframerate(), wave_file.getsampwidth(), wave_file.getnchannels()) != (16000, 2, 1):
+            raise ValueError(f"{file_path} is not a 16 kHz, 16 bit, mono wav file")
+
+        return wave_file.readframes(wave_file.getnframes())
+
+
+def recognize_audio_files(backend_name: str, file_path_list: list[str]) -> tuple[float, float, int]:
+    """Recognizes all audio segments with one backend in a fresh process.
+    Returns the seconds of the recognition, the seconds of the audio segments and the number of recognized words.
+    The model is loaded before the time measurement starts."""
+
+    speech_backend = create_speech_backend(backend_name, configuration.SPEECH_RECOGNITION_BACKEND_CONFIGS[backend_name])
+
+    pcm_data_list = [read_audio_file(file_path) for file_path in file_path_list]
+    audio_seconds = sum(len(pcm_data) for pcm_data in pcm_data_list) / (16000 * 2)
+
+    word_number = 0
+    start_time = time.perf_counter()
+
+    for pcm_data in pcm_data_list:
+        segment_list = speech_backend.decode(pcm_data, configuration.SPEECH_RECOGNITION_RAW_BUFFER_SIZE)
+
+        # meta information (silence, sentence borders) is not counted
+        word_number += sum(1 for segment in segment_list if not segment[0].startswith(('<', '[')))
+
+    return time.perf_counter() - start_time, audio_seconds, word_number
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as temporary_path:
+        if len(sys.argv) > 1:
+            file_path_list = sys.argv[1:]
+        else:
+            file_path_list = [f"{temporary_path}/benchmark.wav"]
+            build_audio_file(file_path_list[0], 60)
+
+        print(f"Audio segments: {len(file_path_list)}")
+
+        for backend_name in SPEECH_BACKENDS:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+                try:
+                    seconds, audio_seconds, word_number = executor.submit(recognize_audio_files, backend_name,
+                                                                          file_path_list).result()
+                except Exception as error:
+                    print(f"{backend_name}: recognition failed ({error})")
+                    continue
+
+            print(f"{backend_name}: real-time factor {seconds / audio_seconds:.3f}, "
+                  f"{word_number / seconds:.1f} words/s ({word_number} words in {seconds:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import collections
 import ntpath
+import os
 
 from campus_wave import configuration
 from controller.html_formatter import HtmlFormatter
@@ -10,6 +11,7 @@ from model.data_interface.search_history import SearchHistory
 from model.data_interface.search_term import SearchTerm
 from model.data_processing.concept_mapping import ConceptMapping
 from model.data_processing.keyword_ranking import KeywordRanking
+from model.data_processing.part_store import PartStore
 
 
 class SearchResult:
@@ -178,6 +180,22 @@ class SearchResult:
 
         return result_tuple_list, result_hits
 
+    @staticmethod
+    def _get_playback_fragment(token_timings, speech_text_list, found_search_terms):
+        """Returns the media fragment of the web player, which starts the audio segment at the first found search term.
+        Audio segments without word timings are played from the beginning.
+
+        """
+
+        for index, token in enumerate(speech_text_list):
+            if token in found_search_terms:
+                # the word timings contain the start frame and the end frame of every word
+                if token_timings and 2 * index < len(token_timings):
+                    return f"#t={token_timings[2 * index] // configuration.SPEECH_RECOGNITION_FRAME_RATE}"
+                break
+
+        return ''
+
     def _get_result_dict(self, rank_counter, document):
         """Converts the information about the found audio file of the retrieval system to a tuple.
 
@@ -197,18 +215,33 @@ class SearchResult:
         # file type e.g. mp3
         file_type = search_dict['file_type']
 
+        # audio segment number
+        audio_segment_number = search_dict['audio_file_part']
+
         # location of the audio segment
         current_audio_segment_location = search_dict['audio_file_location']
-        segment_file_name = ntpath.basename(current_audio_segment_location)
-        stored_audio_segment_location = configuration.AUDIO_PROCESSING_RELATIVE_STORAGE_DICTIONARY + segment_file_name
+
+        playback_file_name = f"{file_hash_value}_{audio_segment_number}." \
+                             f"{configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE}"
+
+        if configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE and os.path.isfile(
+                os.path.join(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY, playback_file_name)):
+            # the compressed audio segment is preferred by the web player
+            stored_audio_segment_location = configuration.AUDIO_PROCESSING_RELATIVE_STORAGE_DICTIONARY + \
+                playback_file_name
+        elif PartStore.is_container_path(current_audio_segment_location):
+            # audio segments of containers are streamed by the web server
+            stored_audio_segment_location = f"{configuration.AUDIO_PROCESSING_PART_URL}{file_hash_value}/" \
+                                            f"{audio_segment_number}"
+        else:
+            segment_file_name = ntpath.basename(current_audio_segment_location)
+            stored_audio_segment_location = configuration.AUDIO_PROCESSING_RELATIVE_STORAGE_DICTIONARY + \
+                segment_file_name
 
         # location of the full audio file
         stored_file_location = ''.join([configuration.DATA_FILTERING_RELATIVE_STORAGE_DICTIONARY, file_hash_value, '.',
                                         file_type])
 
-        # audio segment number
-        audio_segment_number = search_dict['audio_file_part']
-
         # creation date of the audio file
         file_creation_date = self._result_formatter.format_creation_date(search_dict['file_creation_date'])
 
@@ -232,6 +265,10 @@ class SearchResult:
         recognized_speech_list = self._result_formatter.format_recognized_speech(speech_text_list, found_search_terms,
                                                                                  relevant_words_set)
 
+        # the web player jumps to the second of the first found search term
+        stored_audio_segment_location += self._get_playback_fragment(search_dict.get('token_timings'),
+                                                                     speech_text_list, found_search_terms)
+
         # speech recognition precision
         speech_recognition_precision = self._result_formatter.get_speech_recognition_precision(speech_text_list)
 
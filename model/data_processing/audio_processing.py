@@ -1,17 +1,34 @@
+import audioop
 import json
+import logging
+import math
+import multiprocessing
 import os
+import subprocess
+import wave
+import zlib
 
-from campus_wave import configuration
 import pydub
+import pydub.utils
+from campus_wave import configuration
+
+from model.data_processing.part_store import PartStore
+from model.data_processing.sample_buffer import SampleBuffer
+
+_logger = logging.getLogger(__name__)
 
 
 class AudioProcessing:
     """This class converts all relevant audio files into the audio format wav and splits these files into
     smaller audio segments. The audio processing is the second step of the data processing.
+    Each audio segment is stored as [number, location, file name, duration, duration of the audio file, position in
+    the audio file] (milliseconds), audio segments of older runs have no position.
 
     """
 
-    _audio_dictionary = {}
+    _audio_dictionary: dict[str, list] = {}
+    _part_manifest: dict[str, list] = {}
+    _part_store = None
     _added_file_counter = 0
 
     def get_database(self):
@@ -52,6 +69,110 @@ class AudioProcessing:
         else:
             open(configuration.AUDIO_PROCESSING_STORAGE_FILE, 'a').close()
 
+        self._load_manifest()
+
+    def _load_manifest(self):
+        """Loads the conversion manifest of all converted audio files from the hard disc.
+        Later entries of the same audio file replace earlier entries.
+
+        """
+
+        if os.path.isfile(configuration.AUDIO_PROCESSING_MANIFEST_FILE):
+            with open(configuration.AUDIO_PROCESSING_MANIFEST_FILE, encoding="utf8") as file:
+                for one_line in file:
+                    try:
+                        file_id, file_part_list, checksum_list = json.loads(one_line)
+                    except ValueError:
+                        # the last line of an interrupted ingestion can be incomplete
+                        continue
+
+                    self._part_manifest[file_id] = [file_part_list, checksum_list]
+
+    def _append_manifest(self, file_id, file_part_list, checksum_list):
+        """Appends the audio segments of a converted audio file to the conversion manifest on the hard disc.
+
+        """
+
+        self._part_manifest[file_id] = [file_part_list, checksum_list]
+
+        with open(configuration.AUDIO_PROCESSING_MANIFEST_FILE, 'a', encoding="utf8") as file:
+            file.write(f"{json.dumps([file_id, file_part_list, checksum_list])}\n")
+
+    @staticmethod
+    def _get_file_checksum(file_path):
+        """Returns the CRC32 checksum of a file.
+
+        """
+
+        checksum = 0
+
+        with open(file_path, 'rb') as file:
+            while file_block := file.read(1024 * 1024):
+                checksum = zlib.crc32(file_block, checksum)
+
+        return checksum
+
+    def _get_part_size(self, file_id, file_part):
+        """Returns the size of an audio segment or None if the audio segment does not exist.
+
+        """
+
+        if PartStore.is_container_path(file_part[1]):
+            part_data = self._get_part_store().read_part(file_id, file_part[0])
+            return None if part_data is None else len(part_data)
+
+        if not os.path.isfile(file_part[1]):
+            return None
+
+        return os.path.getsize(file_part[1])
+
+    def _get_part_checksum(self, file_id, file_part):
+        """Returns the CRC32 checksum of an audio segment.
+
+        """
+
+        if PartStore.is_container_path(file_part[1]):
+            return zlib.crc32(self._get_part_store().read_part(file_id, file_part[0]))
+
+        return self._get_file_checksum(file_part[1])
+
+    def _get_part_checksums(self, file_id, file_part_list):
+        """Returns the size and the checksum of all audio segments of an audio file.
+
+        """
+
+        return [[self._get_part_size(file_id, file_part), self._get_part_checksum(file_id, file_part)]
+                for file_part in file_part_list]
+
+    def _has_verified_parts(self, file_id, manifest_entry):
+        """Returns True if all audio segments of the conversion manifest entry exist and are unchanged.
+
+        """
+
+        file_part_list, checksum_list = manifest_entry
+
+        if len(file_part_list) != len(checksum_list):
+            return False
+
+        # the sizes are compared first, so missing or truncated audio segments are found without reading them
+        for file_part, (part_size, _checksum) in zip(file_part_list, checksum_list, strict=True):
+            if self._get_part_size(file_id, file_part) != part_size:
+                return False
+
+        return all(self._get_part_checksum(file_id, file_part) == checksum
+                   for file_part, (_part_size, checksum) in zip(file_part_list, checksum_list, strict=True))
+
+    def _get_part_store(self):
+        """Returns the part store of the audio segments which are stored in containers.
+
+        """
+
+        if not AudioProcessing._part_store:
+            AudioProcessing._part_store = PartStore(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY,
+                                                    configuration.AUDIO_PROCESSING_PART_STORE_CACHE_SIZE)
+
+        return AudioProcessing._part_store
+
     @staticmethod
     def _get_audio_segment(file_path, file_type):
         """Returns an audio segment as object of the library PyDub.
@@ -140,6 +261,35 @@ class AudioProcessing:
 
         return configuration.AUDIO_PROCESSING_MAX_DURATION >= len(audio_segment) >= configuration.AUDIO_PROCESSING_MIN_DURATION
 
+    @staticmethod
+    def _get_probed_stream_info(file_info):
+        """Returns the duration, the sampling frequency, the number of channels of the audio file header and whether
+        the duration is exact. Returns None if the header was not probed by the data filtering.
+
+        """
+
+        # file database entries of older data filtering runs contain no stream attributes
+        return file_info[4] if len(file_info) > 4 else None
+
+    @staticmethod
+    def _has_probed_duration(stream_info):
+        """Returns False if the duration of the audio file header is clearly out of the range of correct durations.
+        The audio file is rejected before it is decoded, audio files without probed header or with an estimated
+        duration are always accepted.
+
+        """
+
+        # the duration of MP3 files without Xing or VBRI header is only estimated from the file size, the estimate
+        # of MP3 files with variable bit rate can be far off
+        if not stream_info or len(stream_info) < 4 or not stream_info[3]:
+            return True
+
+        # the decoded duration differs slightly because of the encoder delay and padding
+        tolerance = configuration.AUDIO_PROCESSING_PROBE_DURATION_TOLERANCE
+
+        return configuration.AUDIO_PROCESSING_MAX_DURATION * (1 + tolerance) >= stream_info[0] >= \
+            configuration.AUDIO_PROCESSING_MIN_DURATION * (1 - tolerance)
+
     @staticmethod
     def _export_audio_segment(audio_segment, file_path, file_type):
         """Stores the audio segment into specified audio format on the hard disc.
@@ -157,6 +307,663 @@ class AudioProcessing:
 
         return f"{file_id}_{file_part}.{file_type}"
 
+    def _get_new_file_path(self, file_id, new_file_name, part_container):
+        """Returns the new storage location of the audio segment.
+        All audio segments of a container share the location of the container.
+
+        """
+
+        if part_container:
+            return self._get_part_store().get_container_path(file_id)
+
+        return os.path.join(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY, new_file_name)
+
+    def _convert_pydub_file(self, file_id, file_path, file_type, part_container):
+        """Converts one audio file with the library PyDub and splits it into smaller audio segments.
+        Returns None if the audio file can not be converted.
+
+        """
+
+        audio_segment = self._get_audio_segment(file_path, file_type)
+
+        # checks if the audio segment was correctly processed
+        if not audio_segment or not self._has_correct_duration(audio_segment):
+            return None
+
+        full_audio_duration = len(audio_segment)
+
+        # reduces the sampling frequency of the audio segment
+        audio_segment_frame = self._modify_sampling_frequency(audio_segment)
+
+        # modifies the sample resolution of the audio segment
+        audio_segment_sample = self._modify_sample_width(audio_segment_frame)
+
+        # modifies the number of channels of the audio segment
+        audio_segment_channel = self._modify_channel_size(audio_segment_sample)
+
+        if not audio_segment_channel:
+            return None
+
+        # modifies sound volume of the audio segment
+        audio_segment_loudness = self._modify_sound_volume(audio_segment_channel)
+
+        # splits the audio file into multiple audio segments
+        audio_segment_parts = self._split_audio_file(audio_segment_loudness)
+
+        file_part_list = []
+
+        for counter, audio_part in enumerate(audio_segment_parts):
+            new_file_name = self._get_new_file_name(file_id, counter, configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE)
+
+            # calculates the new storage location of the audio segment
+            new_file_path = self._get_new_file_path(file_id, new_file_name, part_container)
+
+            duration_milli_seconds = len(audio_part)
+            begin_milli_seconds = counter * configuration.AUDIO_PROCESSING_PART_SIZE_MILLISECONDS
+
+            file_part = [counter, new_file_path, new_file_name, duration_milli_seconds, full_audio_duration,
+                         begin_milli_seconds]
+            file_part_list.append(file_part)
+
+            if part_container:
+                part_container.append_part(audio_part.raw_data)
+            else:
+                self._export_audio_segment(audio_part, new_file_path,
+                                           configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE)
+
+        return file_part_list
+
+    @staticmethod
+    def _get_stream_info(file_path):
+        """Returns the sampling frequency and the number of channels of the first audio stream of the audio file.
+        Returns None if the audio file has no readable audio stream.
+
+        """
+
+        try:
+            media_info = pydub.utils.mediainfo_json(file_path)
+            audio_stream = next(stream for stream in media_info['streams'] if stream['codec_type'] == 'audio')
+
+            frame_rate = int(audio_stream['sample_rate'])
+            channels = int(audio_stream['channels'])
+        except Exception:
+            return None
+
+        return frame_rate, channels
+
+    @staticmethod
+    def _read_pcm_blocks(command, block_size):
+        """Starts an ffmpeg process and returns blocks of the raw audio data which ffmpeg writes to its output.
+        Only one block of the decoded audio file is kept in memory at the same time.
+
+        """
+
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+        try:
+            while True:
+                pcm_block = process.stdout.read(block_size)
+
+                if not pcm_block:
+                    break
+
+                yield pcm_block
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+            process.stdout.close()
+            process.wait()
+
+    @staticmethod
+    def _convert_pcm_blocks(pcm_blocks, frame_rate, channels, stream_statistic):
+        """Converts blocks of raw audio data (16 bit samples) to the sampling frequency, the sample resolution and the
+        number of channels of the audio processing phase. The duration and the loudness are collected in the given
+        dictionary.
+
+        """
+
+        rate_state = None
+
+        for pcm_block in pcm_blocks:
+            stream_statistic['source_frames'] += len(pcm_block) // (2 * channels)
+
+            # reduces the sampling frequency of the audio block, the filter state is passed to the next block
+            if frame_rate != configuration.AUDIO_PROCESSING_SAMPLE_RATE:
+                pcm_block, rate_state = audioop.ratecv(pcm_block, 2, channels, frame_rate,
+                                                       configuration.AUDIO_PROCESSING_SAMPLE_RATE, rate_state)
+
+            # modifies the sample resolution of the audio block
+            if configuration.AUDIO_PROCESSING_FRAME_WIDTH != 2:
+                pcm_block = audioop.lin2lin(pcm_block, 2, configuration.AUDIO_PROCESSING_FRAME_WIDTH)
+
+            # modifies the number of channels of the audio block
+            if channels == 2 and configuration.AUDIO_PROCESSING_CHANNELS == 1:
+                pcm_block = audioop.tomono(pcm_block, configuration.AUDIO_PROCESSING_FRAME_WIDTH, 0.5, 0.5)
+            elif channels != configuration.AUDIO_PROCESSING_CHANNELS:
+                raise ValueError(f"unsupported number of channels: {channels}")
+
+            sample_number = len(pcm_block) // configuration.AUDIO_PROCESSING_FRAME_WIDTH
+
+            if sample_number:
+                block_rms = audioop.rms(pcm_block, configuration.AUDIO_PROCESSING_FRAME_WIDTH)
+                stream_statistic['square_sum'] += block_rms * block_rms * sample_number
+                stream_statistic['sample_number'] += sample_number
+
+            yield pcm_block
+
+    @staticmethod
+    def _measure_pcm_blocks(pcm_blocks, stream_statistic):
+        """Collects the duration and the loudness of blocks of raw audio data which are already converted.
+
+        """
+
+        frame_width = configuration.AUDIO_PROCESSING_FRAME_WIDTH
+
+        for pcm_block in pcm_blocks:
+            sample_number = len(pcm_block) // frame_width
+            stream_statistic['source_frames'] += sample_number // configuration.AUDIO_PROCESSING_CHANNELS
+
+            if sample_number:
+                block_rms = audioop.rms(pcm_block, frame_width)
+                stream_statistic['square_sum'] += block_rms * block_rms * sample_number
+                stream_statistic['sample_number'] += sample_number
+
+            yield pcm_block
+
+    @staticmethod
+    def _split_pcm_blocks(pcm_blocks):
+        """Splits blocks of raw audio data into overlapping audio segments.
+        The audio segments match the audio segments of the method _split_audio_file.
+
+        """
+
+        frame_size = configuration.AUDIO_PROCESSING_FRAME_WIDTH * configuration.AUDIO_PROCESSING_CHANNELS
+        frames_per_millisecond = configuration.AUDIO_PROCESSING_SAMPLE_RATE / 1000
+
+        part_size = int(configuration.AUDIO_PROCESSING_PART_SIZE_MILLISECONDS * frames_per_millisecond) * frame_size
+        overlap_size = int(configuration.AUDIO_PROCESSING_PART_SIZE_OVERLAP * frames_per_millisecond) * frame_size
+
+        part_buffer = bytearray()
+
+        for pcm_block in pcm_blocks:
+            part_buffer += pcm_block
+
+            while len(part_buffer) >= part_size + overlap_size:
+                yield bytes(part_buffer[:part_size + overlap_size])
+                del part_buffer[:part_size]
+
+        # the remaining audio segments are shorter than the default duration
+        yield bytes(part_buffer[:part_size + overlap_size])
+
+        while len(part_buffer) >= part_size:
+            del part_buffer[:part_size]
+            yield bytes(part_buffer[:part_size + overlap_size])
+
+    @staticmethod
+    def _export_pcm_part(pcm_data, file_path):
+        """Stores raw audio data as wav file on the hard disc.
+        The wav file is written under a temporary name first, so an interrupted conversion leaves no truncated wav file.
+
+        """
+
+        temporary_file_path = f"{file_path}.tmp"
+
+        try:
+            with wave.open(temporary_file_path, 'wb') as wave_file:
+                wave_file.setnchannels(configuration.AUDIO_PROCESSING_CHANNELS)
+                wave_file.setsampwidth(configuration.AUDIO_PROCESSING_FRAME_WIDTH)
+                wave_file.setframerate(configuration.AUDIO_PROCESSING_SAMPLE_RATE)
+                wave_file.writeframes(pcm_data)
+        except BaseException:
+            if os.path.isfile(temporary_file_path):
+                os.remove(temporary_file_path)
+            raise
+
+        os.replace(temporary_file_path, file_path)
+
+    @staticmethod
+    def _get_stream_gain(stream_statistic):
+        """Returns the gain factor which changes the sound volume of the audio stream to a standard value.
+
+        """
+
+        if not stream_statistic['sample_number'] or not stream_statistic['square_sum']:
+            return 1.0
+
+        rms = math.sqrt(stream_statistic['square_sum'] / stream_statistic['sample_number'])
+        max_amplitude = 2 ** (configuration.AUDIO_PROCESSING_FRAME_WIDTH * 8 - 1)
+
+        current_loudness = 20 * math.log10(rms / max_amplitude)
+        change_loudness = abs(current_loudness) - abs(configuration.AUDIO_PROCESSING_OPTIMAL_LOUDNESS)
+
+        return 10 ** (change_loudness / 20)
+
+    @staticmethod
+    def _apply_pcm_gain(file_path, gain):
+        """Changes the sound volume of a stored wav file.
+
+        """
+
+        with wave.open(file_path, 'rb') as wave_file:
+            pcm_data = wave_file.readframes(wave_file.getnframes())
+
+        with wave.open(file_path, 'wb') as wave_file:
+            wave_file.setnchannels(configuration.AUDIO_PROCESSING_CHANNELS)
+            wave_file.setsampwidth(configuration.AUDIO_PROCESSING_FRAME_WIDTH)
+            wave_file.setframerate(configuration.AUDIO_PROCESSING_SAMPLE_RATE)
+            wave_file.writeframes(audioop.mul(pcm_data, configuration.AUDIO_PROCESSING_FRAME_WIDTH, gain))
+
+    def _export_pcm_blocks(self, file_id, pcm_blocks, frame_rate, stream_statistic, part_container):
+        """Splits converted blocks of raw audio data into audio segments and writes them directly to the hard disc.
+        Returns the list of all audio segments and the list of new wav files or None if the audio file has a wrong
+        duration or can not be decoded.
+
+        """
+
+        file_part_list = []
+        new_file_path_list = []
+
+        try:
+            for counter, pcm_part in enumerate(self._split_pcm_blocks(pcm_blocks)):
+                # stops the conversion as soon as the audio file is too long
+                if stream_statistic['source_frames'] * 1000 / frame_rate > configuration.AUDIO_PROCESSING_MAX_DURATION:
+                    raise ValueError("audio file is too long")
+
+                new_file_name = self._get_new_file_name(file_id, counter,
+                                                        configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE)
+
+                # calculates the new storage location of the audio segment
+                new_file_path = self._get_new_file_path(file_id, new_file_name, part_container)
+
+                frame_number = len(pcm_part) // (configuration.AUDIO_PROCESSING_FRAME_WIDTH *
+                                                 configuration.AUDIO_PROCESSING_CHANNELS)
+                duration_milli_seconds = round(1000 * frame_number / configuration.AUDIO_PROCESSING_SAMPLE_RATE)
+                begin_milli_seconds = counter * configuration.AUDIO_PROCESSING_PART_SIZE_MILLISECONDS
+
+                file_part_list.append([counter, new_file_path, new_file_name, duration_milli_seconds,
+                                       begin_milli_seconds])
+
+                if part_container:
+                    part_container.append_part(pcm_part)
+                else:
+                    self._export_pcm_part(pcm_part, new_file_path)
+                    new_file_path_list.append(new_file_path)
+
+            full_audio_duration = round(1000 * stream_statistic['source_frames'] / frame_rate)
+
+            if not configuration.AUDIO_PROCESSING_MAX_DURATION >= full_audio_duration >= \
+                    configuration.AUDIO_PROCESSING_MIN_DURATION:
+                raise ValueError("audio file has a wrong duration")
+        except Exception:
+            # removes the audio segments of the audio file which could not be converted
+            for new_file_path in new_file_path_list:
+                os.remove(new_file_path)
+
+            return None
+
+        # the duration of the audio file is stored in front of the position in the audio file
+        for file_part in file_part_list:
+            file_part.insert(4, full_audio_duration)
+
+        return file_part_list, new_file_path_list
+
+    def _convert_streaming_file(self, file_id, file_path, part_container, stream_info):
+        """Converts one audio file block by block and writes the audio segments directly to the hard disc.
+        The memory usage is bounded by the duration of one audio segment instead of the duration of the audio file.
+        Returns None if the audio file can not be converted.
+
+        """
+
+        # the stream attributes of the audio file header save the start of ffprobe
+        if stream_info:
+            frame_rate, channels = stream_info[1:3]
+        else:
+            stream_info = self._get_stream_info(file_path)
+
+            if not stream_info:
+                return None
+
+            frame_rate, channels = stream_info
+
+        stream_statistic = {'source_frames': 0, 'square_sum': 0, 'sample_number': 0}
+
+        # audio files with more than two channels are mixed down to stereo by ffmpeg
+        channels = min(channels, 2)
+
+        command = [pydub.AudioSegment.converter, '-nostdin', '-v', 'error', '-i', file_path, '-vn',
+                   '-ac', str(channels), '-f', 's16le', '-acodec', 'pcm_s16le', '-']
+
+        block_size = int(frame_rate * configuration.AUDIO_PROCESSING_BLOCK_SIZE_MILLISECONDS / 1000) * 2 * channels
+
+        pcm_blocks = self._convert_pcm_blocks(self._read_pcm_blocks(command, block_size), frame_rate, channels,
+                                              stream_statistic)
+
+        export_result = self._export_pcm_blocks(file_id, pcm_blocks, frame_rate, stream_statistic, part_container)
+
+        if not export_result:
+            return None
+
+        file_part_list, new_file_path_list = export_result
+
+        # modifies sound volume of the new audio segments, the loudness is only known after the last block
+        gain = self._get_stream_gain(stream_statistic)
+
+        if part_container:
+            part_container.apply_gain(gain)
+
+        for new_file_path in new_file_path_list:
+            self._apply_pcm_gain(new_file_path, gain)
+
+        return file_part_list
+
+    def _convert_ffmpeg_file(self, file_id, file_path, part_container):
+        """Converts one audio file in a single ffmpeg process which decodes, resamples and mixes down the audio file.
+        The converted audio data is split into overlapping audio segments while ffmpeg is still running.
+        Returns None if the audio file can not be converted.
+
+        """
+
+        stream_statistic = {'source_frames': 0, 'square_sum': 0, 'sample_number': 0}
+
+        frame_width = configuration.AUDIO_PROCESSING_FRAME_WIDTH
+        sample_format = 's8' if frame_width == 1 else f's{frame_width * 8}le'
+
+        command = [pydub.AudioSegment.converter, '-nostdin', '-v', 'error', '-i', file_path, '-vn',
+                   '-ar', str(configuration.AUDIO_PROCESSING_SAMPLE_RATE),
+                   '-ac', str(configuration.AUDIO_PROCESSING_CHANNELS), '-f', sample_format,
+                   '-acodec', f'pcm_{sample_format}', '-']
+
+        block_size = int(configuration.AUDIO_PROCESSING_SAMPLE_RATE *
+                         configuration.AUDIO_PROCESSING_BLOCK_SIZE_MILLISECONDS / 1000)
+        block_size *= frame_width * configuration.AUDIO_PROCESSING_CHANNELS
+
+        pcm_blocks = self._measure_pcm_blocks(self._read_pcm_blocks(command, block_size), stream_statistic)
+
+        export_result = self._export_pcm_blocks(file_id, pcm_blocks, configuration.AUDIO_PROCESSING_SAMPLE_RATE,
+                                                stream_statistic, part_container)
+
+        if not export_result:
+            return None
+
+        file_part_list, new_file_path_list = export_result
+
+        # modifies sound volume of the new audio segments, the loudness is only known after the last block
+        gain = self._get_stream_gain(stream_statistic)
+
+        if part_container:
+            part_container.apply_gain(gain)
+
+        for new_file_path in new_file_path_list:
+            self._apply_pcm_gain(new_file_path, gain)
+
+        return file_part_list
+
+    def _convert_numpy_file(self, file_id, file_path, file_type, part_container):
+        """Converts one audio file with the library PyDub, normalizes and splits it with a NumPy sample buffer.
+        The audio segments are written directly from views of the sample buffer.
+        Returns None if the audio file can not be converted.
+
+        """
+
+        audio_segment = self._get_audio_segment(file_path, file_type)
+
+        # checks if the audio segment was correctly processed
+        if not audio_segment or not self._has_correct_duration(audio_segment):
+            return None
+
+        full_audio_duration = len(audio_segment)
+
+        audio_segment = self._modify_sampling_frequency(audio_segment)
+        audio_segment = self._modify_sample_width(audio_segment)
+        audio_segment = self._modify_channel_size(audio_segment)
+
+        if not audio_segment:
+            return None
+
+        sample_buffer = SampleBuffer.from_audio_segment(audio_segment)
+        del audio_segment
+
+        # modifies sound volume of the audio file in place
+        sample_buffer.normalize(configuration.AUDIO_PROCESSING_OPTIMAL_LOUDNESS)
+
+        if configuration.AUDIO_PROCESSING_SEGMENTATION == 'vad':
+            # cuts the audio file at silences and removes all regions without speech
+            speech_region_list = sample_buffer.get_speech_regions(
+                configuration.AUDIO_PROCESSING_VAD_FRAME_MILLISECONDS,
+                configuration.AUDIO_PROCESSING_VAD_ENERGY_THRESHOLD,
+                configuration.AUDIO_PROCESSING_VAD_ZERO_CROSSING_THRESHOLD,
+                configuration.AUDIO_PROCESSING_VAD_MIN_SILENCE_MILLISECONDS,
+                configuration.AUDIO_PROCESSING_VAD_MIN_SPEECH_MILLISECONDS,
+                configuration.AUDIO_PROCESSING_VAD_PADDING_MILLISECONDS)
+
+            audio_segment_parts = sample_buffer.split_speech_parts(
+                configuration.AUDIO_PROCESSING_PART_SIZE_MILLISECONDS,
+                configuration.AUDIO_PROCESSING_PART_SIZE_OVERLAP, speech_region_list)
+        else:
+            audio_segment_parts = sample_buffer.split_parts(configuration.AUDIO_PROCESSING_PART_SIZE_MILLISECONDS,
+                                                            configuration.AUDIO_PROCESSING_PART_SIZE_OVERLAP)
+
+        file_part_list = []
+
+        for counter, audio_part in enumerate(audio_segment_parts):
+            new_file_name = self._get_new_file_name(file_id, counter, configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE)
+
+            # calculates the new storage location of the audio segment
+            new_file_path = self._get_new_file_path(file_id, new_file_name, part_container)
+
+            # the speech regions of the voice activity detection are stored with their position in the audio file
+            file_part = [counter, new_file_path, new_file_name, audio_part.get_duration(), full_audio_duration,
+                         audio_part.get_start()]
+            file_part_list.append(file_part)
+
+            if part_container:
+                part_container.append_part(memoryview(audio_part.get_samples()).cast('B'))
+            else:
+                audio_part.export_wav(new_file_path)
+
+        return file_part_list
+
+    def read_part_data(self, file_id, file_part):
+        """Returns the raw audio data of an audio segment which is stored as wav file or in a container.
+
+        """
+
+        if PartStore.is_container_path(file_part[1]):
+            return self._get_part_store().read_part(file_id, file_part[0])
+
+        with wave.open(file_part[1], 'rb') as wave_file:
+            return wave_file.readframes(wave_file.getnframes())
+
+    @staticmethod
+    def _encode_playback_part(pcm_data, playback_file_path):
+        """Encodes the raw audio data of an audio segment into a compressed audio file for the web player.
+        Returns True if the compressed audio file was created.
+
+        """
+
+        frame_width = configuration.AUDIO_PROCESSING_FRAME_WIDTH
+        sample_format = 's8' if frame_width == 1 else f's{frame_width * 8}le'
+
+        temporary_file_path = f"{playback_file_path}.tmp"
+
+        command = [pydub.AudioSegment.converter, '-nostdin', '-v', 'error', '-y', '-f', sample_format,
+                   '-ar', str(configuration.AUDIO_PROCESSING_SAMPLE_RATE),
+                   '-ac', str(configuration.AUDIO_PROCESSING_CHANNELS), '-i', '-',
+                   '-b:a', configuration.AUDIO_PROCESSING_PLAYBACK_BITRATE,
+                   '-f', configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE, temporary_file_path]
+
+        try:
+            subprocess.run(command, input=pcm_data, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            if os.path.isfile(temporary_file_path):
+                os.remove(temporary_file_path)
+
+            return False
+
+        os.replace(temporary_file_path, playback_file_path)
+
+        return True
+
+    def _export_playback_parts(self, file_id, file_part_list):
+        """Creates the missing compressed audio files of all audio segments of an audio file for the web player.
+        The compressed audio files are encoded from the converted audio data, the audio file is not decoded again.
+
+        """
+
+        if not configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE:
+            return
+
+        for file_part in file_part_list:
+            playback_file_name = self._get_new_file_name(file_id, file_part[0],
+                                                         configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE)
+            playback_file_path = os.path.join(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY, playback_file_name)
+
+            if not os.path.isfile(playback_file_path):
+                self._encode_playback_part(self.read_part_data(file_id, file_part), playback_file_path)
+
+    def _convert_audio_file(self, file_id, file_path, file_type, stream_info=None):
+        """Converts one audio file with the configured audio processing backend.
+        The stream attributes (duration, sampling frequency, number of channels) of the data filtering are optional.
+        Returns a list of all audio segments or None if the audio file can not be converted.
+
+        """
+
+        part_container = None
+
+        if configuration.AUDIO_PROCESSING_PART_STORE == 'container':
+            part_container = self._get_part_store().create_container(
+                file_id, configuration.AUDIO_PROCESSING_SAMPLE_RATE, configuration.AUDIO_PROCESSING_FRAME_WIDTH,
+                configuration.AUDIO_PROCESSING_CHANNELS)
+
+        try:
+            if configuration.AUDIO_PROCESSING_BACKEND == 'streaming':
+                file_part_list = self._convert_streaming_file(file_id, file_path, part_container, stream_info)
+            elif configuration.AUDIO_PROCESSING_BACKEND == 'ffmpeg':
+                file_part_list = self._convert_ffmpeg_file(file_id, file_path, part_container)
+            elif configuration.AUDIO_PROCESSING_BACKEND == 'numpy':
+                file_part_list = self._convert_numpy_file(file_id, file_path, file_type, part_container)
+            else:
+                file_part_list = self._convert_pydub_file(file_id, file_path, file_type, part_container)
+        except BaseException:
+            if part_container:
+                part_container.discard()
+            raise
+
+        if part_container:
+            if file_part_list is None:
+                part_container.discard()
+            else:
+                part_container.commit()
+
+        return file_part_list
+
+    def _remove_audio_parts(self, file_id, file_part_list):
+        """Removes the stored audio segments of an audio file and their compressed audio files from the hard disc.
+
+        """
+
+        for file_part in file_part_list:
+            if PartStore.is_container_path(file_part[1]):
+                self._get_part_store().remove_container(file_id)
+            elif os.path.isfile(file_part[1]):
+                os.remove(file_part[1])
+
+            # the compressed audio files are only created if they are missing, old ones would be played otherwise
+            if configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE:
+                playback_file_name = self._get_new_file_name(file_id, file_part[0],
+                                                             configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE)
+                playback_file_path = os.path.join(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY,
+                                                  playback_file_name)
+
+                if os.path.isfile(playback_file_path):
+                    os.remove(playback_file_path)
+
+    def _remove_stale_parts(self, file_id):
+        """Removes the audio segments of an interrupted conversion, which has no conversion manifest entry.
+        The audio segments are numbered without gaps, so they are removed until the first missing number.
+
+        """
+
+        self._get_part_store().remove_container(file_id)
+
+        file_type_list = [configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE]
+
+        if configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE:
+            file_type_list.append(configuration.AUDIO_PROCESSING_PLAYBACK_FILE_TYPE)
+
+        counter = 0
+
+        while True:
+            stale_file_path_list = [
+                os.path.join(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY,
+                             self._get_new_file_name(file_id, counter, file_type)) for file_type in file_type_list]
+            stale_file_path_list = [file_path for file_path in stale_file_path_list if os.path.isfile(file_path)]
+
+            if not stale_file_path_list:
+                break
+
+            for file_path in stale_file_path_list:
+                os.remove(file_path)
+
+            counter += 1
+
+    def remove_files(self, file_id_list):
+        """Removes audio files and their audio segments from the database and the hard disc.
+
+        """
+
+        for file_id in file_id_list:
+            file_part_list = self._audio_dictionary.pop(file_id, None)
+            manifest_entry = self._part_manifest.pop(file_id, None)
+
+            if file_part_list is None and manifest_entry:
+                file_part_list = manifest_entry[0]
+
+            if file_part_list:
+                self._remove_audio_parts(file_id, file_part_list)
+
+    def _process_audio_file(self, file_id, file_path, file_type, manifest_entry, stream_info=None):
+        """Returns the audio segments of an audio file and the checksums of new audio segments.
+        Audio files whose audio segments of a previous run are unchanged are not decoded again, the checksums are
+        None in this case.
+
+        """
+
+        if manifest_entry:
+            if self._has_verified_parts(file_id, manifest_entry):
+                self._export_playback_parts(file_id, manifest_entry[0])
+
+                return manifest_entry[0], None
+
+            # removes the changed audio segments and their compressed audio files, otherwise they would not be
+            # exported again
+            self._remove_audio_parts(file_id, manifest_entry[0])
+
+        # complete or truncated audio segments of an interrupted conversion would be reused without normalization
+        self._remove_stale_parts(file_id)
+
+        file_part_list = self._convert_audio_file(file_id, file_path, file_type, stream_info)
+
+        if file_part_list is None:
+            return None, None
+
+        # creates the compressed audio files for the web player from the new audio segments
+        self._export_playback_parts(file_id, file_part_list)
+
+        return file_part_list, self._get_part_checksums(file_id, file_part_list)
+
+    @staticmethod
+    def _check_segmentation():
+        """Warns if the configured segmentation is not supported by the configured audio processing backend.
+
+        """
+
+        if configuration.AUDIO_PROCESSING_SEGMENTATION != 'fixed' and configuration.AUDIO_PROCESSING_BACKEND != 'numpy':
+            _logger.warning("The segmentation '%s' is only supported by the audio processing backend 'numpy', the "
+                            "backend '%s' splits the audio files into audio segments of the same duration",
+                            configuration.AUDIO_PROCESSING_SEGMENTATION, configuration.AUDIO_PROCESSING_BACKEND)
+
     def update_database(self, file_database):
         """Converts all audio files into the audio format wav and splits these files into smaller audio segments.
 
@@ -164,76 +971,107 @@ class AudioProcessing:
 
         os.makedirs(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY, exist_ok=True)
 
+        self._check_segmentation()
+
         for file_id, file_info in file_database.items():
 
-            file_path, file_name, file_type, creation_date_timestamp = file_info
+            file_path, file_name, file_type, creation_date_timestamp = file_info[:4]
+            stream_info = self._get_probed_stream_info(file_info)
 
             self._added_file_counter += 1
 
             if self._added_file_counter < configuration.AUDIO_PROCESSING_MAX_FILES:
 
-                # checks if the audio file is already in the database
-                if file_id not in self._audio_dictionary:
+                # checks if the audio file is already in the database and has a correct duration in its header
+                if file_id not in self._audio_dictionary and self._has_probed_duration(stream_info):
 
-                    audio_segment = self._get_audio_segment(file_path, file_type)
+                    file_part_list, checksum_list = self._process_audio_file(
+                        file_id, file_path, file_type, self._part_manifest.get(file_id), stream_info)
 
-                    counter = 0
+                    self.add_converted_file(file_id, file_part_list, checksum_list)
+                else:
+                    pass
+            else:
+                return True
 
-                    # checks if the audio segment was correctly processed
-                    if audio_segment:
-                        correct_duration = self._has_correct_duration(audio_segment)
-                        full_audio_duration = len(audio_segment)
+    def add_converted_file(self, file_id, file_part_list, checksum_list):
+        """Stores the audio segments of a converted audio file into the dictionary (hash map).
+        The checksums of new audio segments are appended to the manifest.
 
-                        if correct_duration:
-                            # reduces the sampling frequency of the audio segment
-                            audio_segment_frame = self._modify_sampling_frequency(audio_segment)
+        """
 
-                            # modifies the sample resolution of the audio segment
-                            audio_segment_sample = self._modify_sample_width(audio_segment_frame)
+        # checks if the audio file was correctly processed
+        if file_part_list is not None:
+            # stores the audio segments into dictionary (hashmap)
+            self._audio_dictionary[file_id] = file_part_list
 
-                            # modifies the number of channels of the audio segment
-                            audio_segment_channel = self._modify_channel_size(audio_segment_sample)
+            if checksum_list is not None:
+                self._append_manifest(file_id, file_part_list, checksum_list)
 
-                            if audio_segment_channel:
+    def reduce_file_database_parallel(self, file_database):
+        """Returns a list of all audio files which are not in the database yet.
+        Each audio file is an input of the function convert_audio_file_parallel.
 
-                                # modifies sound volume of the audio segment
-                                audio_segment_loudness = self._modify_sound_volume(audio_segment_channel)
+        """
 
-                                # splits the audio file into multiple audio segments
-                                audio_segment_parts = self._split_audio_file(audio_segment_loudness)
+        os.makedirs(configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY, exist_ok=True)
 
-                                file_part_list = []
+        self._check_segmentation()
 
-                                for audio_part in audio_segment_parts:
-                                    new_file_name = self._get_new_file_name(file_id, counter,
-                                                                            configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE)
+        reduced_file_list = []
 
-                                    # calculates the new storage location of the audio segment
-                                    new_file_path = os.path.join(
-                                        configuration.AUDIO_PROCESSING_STORAGE_DICTIONARY,
-                                        new_file_name)
+        for file_id, file_info in file_database.items():
 
-                                    duration_milli_seconds = len(audio_part)
-                                    file_part = [counter, new_file_path, new_file_name, duration_milli_seconds,
-                                                 full_audio_duration]
-                                    file_part_list.append(file_part)
+            file_path, file_name, file_type, creation_date_timestamp = file_info[:4]
+            stream_info = self._get_probed_stream_info(file_info)
 
-                                    counter += 1
+            self._added_file_counter += 1
 
-                                    self._export_audio_segment(audio_part, new_file_path,
-                                                               configuration.AUDIO_PROCESSING_DEFAULT_FILE_TYPE)
+            if self._added_file_counter >= configuration.AUDIO_PROCESSING_MAX_FILES:
+                break
 
-                                # stores the audio segments into dictionary (hashmap)
-                                self._audio_dictionary[file_id] = file_part_list
+            # checks if the audio file is already in the database and has a correct duration in its header
+            if file_id not in self._audio_dictionary and self._has_probed_duration(stream_info):
+                reduced_file_list.append((file_id, file_path, file_type, self._part_manifest.get(file_id),
+                                          stream_info))
 
-                                pass
-                            else:
-                                pass
-                        else:
-                            pass
-                    else:
-                        pass
-                else:
-                    pass
-            else:
-                return True
+        return reduced_file_list
+
+    def update_database_parallel(self, file_database):
+        """Converts all audio files in parallel into the audio format wav and splits these files into smaller audio
+        segments. The results are collected in the order of the file database and stored regularly.
+
+        """
+
+        reduced_file_list = self.reduce_file_database_parallel(file_database)
+
+        if reduced_file_list:
+
+            # initializes all processes for the parallel audio processing
+            with multiprocessing.Pool(processes=configuration.AUDIO_PROCESSING_CALCULATION_CORES) as process_pool:
+
+                result_list = process_pool.imap(convert_audio_file_parallel, reduced_file_list)
+
+                for result_counter, (file_id, file_part_list, checksum_list) in enumerate(result_list, start=1):
+
+                    self.add_converted_file(file_id, file_part_list, checksum_list)
+
+                    # stores the converted audio files
+                    if result_counter % configuration.AUDIO_PROCESSING_CHECKPOINT_FILES == 0:
+                        self.store_database()
+
+        return True
+
+
+def convert_audio_file_parallel(input_file_tuple):
+    """Converts one audio file in a separate process.
+    Audio segments of a previous run are verified in the separate process as well.
+
+    """
+
+    file_id, file_path, file_type, manifest_entry, stream_info = input_file_tuple
+
+    file_part_list, checksum_list = AudioProcessing()._process_audio_file(file_id, file_path, file_type,
+                                                                          manifest_entry, stream_info)
+
+    return file_id, file_part_list, checksum_list
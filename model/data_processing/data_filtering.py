@@ -1,10 +1,41 @@
+import concurrent.futures
+import contextlib
 import hashlib
 import json
+import logging
 import os
 import shutil
+import threading
+import time
+import types
+import zlib
 
 from campus_wave import configuration
-import tinytag
+
+# copy-on-write clones of files are only supported on Linux
+fcntl: types.ModuleType | None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from model.data_processing.file_watching import FileWatching
+from model.data_processing.pattern_matching import PatternMatching
+from model.data_processing.tag_probing import TagProbing
+
+# ioctl request code for copy-on-write clones of files (see: man 2 ioctl_ficlone)
+FICLONE = 0x40049409
+
+# reusable read buffers of the threads which calculate the file ids
+_thread_data = threading.local()
+
+_logger = logging.getLogger(__name__)
 
 
 class DataFiltering:
@@ -13,13 +44,28 @@ class DataFiltering:
 
     """
 
-    _file_dictionary = {}
+    _file_dictionary: dict[str, list] = {}
+    _file_manifest: dict[str, list] = {}
     _added_file_counter = 0
-    _is_current_file_correct = True
-    _current_tiny_tag = None
 
     _all_byte_file_size = 0
 
+    _hashed_byte_counter = 0
+    _hashing_seconds = 0.0
+
+    _replaced_file_id_list: list[str] = []
+
+    _backup_executor = None
+    _backup_futures: set[concurrent.futures.Future] = set()
+
+    # the lists of file names and file paths are compiled once at startup
+    _included_file_name_matcher = PatternMatching(configuration.DATA_FILTERING_INCLUDED_FILE_NAMES)
+    _excluded_file_name_matcher = PatternMatching(configuration.DATA_FILTERING_EXCLUDED_FILE_NAMES)
+    _excluded_file_path_matcher = PatternMatching(configuration.DATA_FILTERING_EXCLUDED_FILE_PATHS)
+
+    # the ID3 Tag probing has no state and is shared by all threads
+    _tag_prober = TagProbing()
+
     def get_database(self):
         """Returns a dictionary (hash map) with all relevant audio files.
 
@@ -33,30 +79,188 @@ class DataFiltering:
 
         """
 
-        if not os.path.isfile(configuration.DATA_FILTERING_STORAGE_FILE):
+        self._write_database_file(configuration.DATA_FILTERING_STORAGE_FILE)
+
+        self._store_manifest(configuration.DATA_FILTERING_MANIFEST_FILE)
+
+    def load_database(self):
+        """Loads the all relevant audio files from the hard disc.
+        The data set is stored as a JSON file.
+
+        """
+
+        if os.path.isfile(configuration.DATA_FILTERING_STORAGE_FILE):
+            for file_id, file_info in self._read_database_file(configuration.DATA_FILTERING_STORAGE_FILE):
+                self._file_dictionary[file_id] = file_info
+        else:
             open(configuration.DATA_FILTERING_STORAGE_FILE, 'a').close()
 
-        with open(configuration.DATA_FILTERING_STORAGE_FILE, 'w', encoding="utf8") as file:
+        self._load_manifest(configuration.DATA_FILTERING_MANIFEST_FILE)
+
+    def store_shard_database(self):
+        """Stores the relevant audio files of this ingestion machine (shard) to the hard disc.
+        The partial data set is stored as a JSON file.
+
+        """
+
+        self._write_database_file(self._get_shard_file(configuration.DATA_FILTERING_STORAGE_FILE,
+                                                       configuration.DATA_FILTERING_SHARD_INDEX))
+
+        self._store_manifest(self._get_shard_file(configuration.DATA_FILTERING_MANIFEST_FILE,
+                                                  configuration.DATA_FILTERING_SHARD_INDEX))
+
+    def load_shard_database(self):
+        """Loads the relevant audio files of this ingestion machine (shard) from the hard disc.
+        The partial data set is stored as a JSON file.
+
+        """
+
+        shard_storage_file = self._get_shard_file(configuration.DATA_FILTERING_STORAGE_FILE,
+                                                  configuration.DATA_FILTERING_SHARD_INDEX)
+
+        if os.path.isfile(shard_storage_file):
+            for file_id, file_info in self._read_database_file(shard_storage_file):
+                self._file_dictionary[file_id] = file_info
+
+        self._load_manifest(self._get_shard_file(configuration.DATA_FILTERING_MANIFEST_FILE,
+                                                 configuration.DATA_FILTERING_SHARD_INDEX))
+
+    def merge_shard_databases(self):
+        """Merges the partial data sets and the file manifests of all ingestion machines (shards) into the data set.
+        Audio files which were found by multiple ingestion machines are only added once.
+
+        """
+
+        for shard_index in range(configuration.DATA_FILTERING_SHARD_NUMBER):
+            # the file scan after the merge reuses the file ids of all ingestion machines
+            self._load_manifest(self._get_shard_file(configuration.DATA_FILTERING_MANIFEST_FILE, shard_index))
+
+            shard_storage_file = self._get_shard_file(configuration.DATA_FILTERING_STORAGE_FILE, shard_index)
+
+            if os.path.isfile(shard_storage_file):
+                for file_id, file_info in self._read_database_file(shard_storage_file):
+
+                    # the ingestion machine with the lowest shard number wins
+                    if file_id not in self._file_dictionary:
+                        self._file_dictionary[file_id] = file_info
+
+    def _write_database_file(self, storage_file):
+        """Stores the all relevant audio files into the given JSON file.
+
+        """
+
+        with open(storage_file, 'w', encoding="utf8") as file:
             for key, value in self._file_dictionary.items():
                 line_list = [key, value]
                 json_content = json.dumps(line_list)
                 file.write(f"{json_content}\n")
 
-    def load_database(self):
-        """Loads the all relevant audio files from the hard disc.
+    @staticmethod
+    def _read_database_file(storage_file):
+        """Returns all relevant audio files of the given JSON file.
+
+        """
+
+        with open(storage_file, encoding="utf8") as file:
+            for one_line in file.readlines():
+                line_list = json.loads(one_line)
+                file_id = line_list[0]
+                file_info = line_list[1]
+                yield file_id, file_info
+
+    @staticmethod
+    def _get_shard_file(storage_file, shard_index):
+        """Returns the location of a data set of one ingestion machine (shard).
+        Without sharding the location is not changed.
+
+        """
+
+        if configuration.DATA_FILTERING_SHARD_NUMBER <= 1:
+            return storage_file
+
+        storage_path, file_extension = os.path.splitext(storage_file)
+        return f"{storage_path}_shard_{shard_index}{file_extension}"
+
+    @staticmethod
+    def _is_shard_dictionary(dir_path):
+        """Returns True if the folder belongs to this ingestion machine (shard).
+        The folders of the file archive are distributed by the hash value of the folder name.
+
+        """
+
+        dir_name = os.path.basename(dir_path).lower()
+
+        # crc32 returns the same hash value on all ingestion machines
+        shard_index = zlib.crc32(dir_name.encode('utf8')) % configuration.DATA_FILTERING_SHARD_NUMBER
+        return shard_index == configuration.DATA_FILTERING_SHARD_INDEX
+
+    @classmethod
+    def _is_shard_path(cls, file_path):
+        """Returns True if the audio file belongs to this ingestion machine (shard).
+        The files are distributed like the folders of the file scan or by the hash value of the file path, so the
+        ID3 Tags and the file ids are only read for the audio files of this ingestion machine.
+
+        """
+
+        if configuration.DATA_FILTERING_SHARD_NUMBER <= 1:
+            return True
+
+        relative_path = os.path.relpath(file_path, configuration.DATA_FILTERING_START_DICTIONARY)
+        path_list = os.path.normpath(relative_path).split(os.sep)
+
+        if configuration.DATA_FILTERING_SHARD_MODE == 'hash':
+            # crc32 returns the same hash value on all ingestion machines, also with different path separators
+            path_hash = zlib.crc32('/'.join(path_list).lower().encode('utf8'))
+            return path_hash % configuration.DATA_FILTERING_SHARD_NUMBER == configuration.DATA_FILTERING_SHARD_INDEX
+
+        # the files of the start folder are scanned by the first ingestion machine
+        if len(path_list) == 1:
+            return configuration.DATA_FILTERING_SHARD_INDEX == 0
+
+        return cls._is_shard_dictionary(path_list[0])
+
+    def _store_manifest(self, manifest_file):
+        """Stores the file attributes of all scanned audio files to the hard disc.
         The data set is stored as a JSON file.
 
         """
 
-        if os.path.isfile(configuration.DATA_FILTERING_STORAGE_FILE):
-            with open(configuration.DATA_FILTERING_STORAGE_FILE, encoding="utf8") as file:
+        with open(manifest_file, 'w', encoding="utf8") as file:
+            for key, value in self._file_manifest.items():
+                line_list = [key, value]
+                json_content = json.dumps(line_list)
+                file.write(f"{json_content}\n")
+
+    def _load_manifest(self, manifest_file):
+        """Loads the file attributes of all scanned audio files from the hard disc.
+        Each entry contains the file size, the modification time, the ID3 Tag result, the file id, the stream
+        attributes (duration, sampling frequency, number of channels) of the audio file and the calculation of the
+        file id.
+
+        """
+
+        if os.path.isfile(manifest_file):
+            with open(manifest_file, encoding="utf8") as file:
                 for one_line in file.readlines():
                     line_list = json.loads(one_line)
-                    file_id = line_list[0]
-                    file_info = line_list[1]
-                    self._file_dictionary[file_id] = file_info
-        else:
-            open(configuration.DATA_FILTERING_STORAGE_FILE, 'a').close()
+                    file_path = line_list[0]
+                    manifest_entry = line_list[1]
+                    self._file_manifest[file_path] = manifest_entry
+
+    def _is_unchanged_file(self, file_path, file_stat):
+        """Returns True if the audio file was not modified since the last file scan.
+
+        """
+
+        manifest_entry = self._file_manifest.get(file_path)
+
+        if manifest_entry:
+            file_size, modification_time = manifest_entry[:2]
+
+            # compares the file size and the modification time with the last file scan
+            return file_size == file_stat.st_size and modification_time == file_stat.st_mtime_ns
+
+        return False
 
     @staticmethod
     def _has_supported_extension(file_name):
@@ -73,18 +277,17 @@ class DataFiltering:
         return False
 
     @staticmethod
-    def _has_supported_file_size(file_path):
+    def _has_supported_file_size(file_stat):
         """Returns True if the audio file has the correct file size.
 
         """
 
-        _file_size = os.stat(file_path).st_size
+        _file_size = file_stat.st_size
 
         # the file size has to be in a predefined file size range
         return configuration.DATA_FILTERING_MIN_FILE_SIZE <= _file_size <= configuration.DATA_FILTERING_MAX_FILE_SIZE
 
-    @staticmethod
-    def _has_correct_file_name(file_name):
+    def _has_correct_file_name(self, file_name):
         """Returns True if the file name of the audio file is correct.
         Audio files with special files name are included for indexing.
 
@@ -92,15 +295,10 @@ class DataFiltering:
 
         lower_file_name = file_name.lower()
 
-        for correct_file_name in configuration.DATA_FILTERING_INCLUDED_FILE_NAMES:
-
-            # checks if the file name is in the list of predefined file names
-            if lower_file_name.find(correct_file_name) > -1:
-                return True
-        return False
+        # checks if the file name is in the list of predefined file names
+        return self._included_file_name_matcher.has_match(lower_file_name)
 
-    @staticmethod
-    def _has_not_wrong_file_name(file_name):
+    def _has_not_wrong_file_name(self, file_name):
         """Returns True if the file name of the audio file is correct.
         Audio files with wrong files name are filtered out form the data set.
 
@@ -108,16 +306,10 @@ class DataFiltering:
 
         lower_file_name = file_name.lower()
 
-        for correct_file_name in configuration.DATA_FILTERING_EXCLUDED_FILE_NAMES:
-
-            # checks if the file name is in the list of excluded file names
-            if lower_file_name.find(correct_file_name) > -1:
-                return False
-
-        return True
+        # checks if the file name is in the list of excluded file names
+        return not self._excluded_file_name_matcher.has_match(lower_file_name)
 
-    @staticmethod
-    def _has_not_wrong_path(file_path):
+    def _has_not_wrong_path(self, file_path):
         """Returns True if the file path of the audio file is correct.
         Audio files which are located in predefined locations are filtered out from the data set.
 
@@ -125,67 +317,237 @@ class DataFiltering:
 
         lower_file_path = file_path.lower()
 
-        for correct_file_name in configuration.DATA_FILTERING_EXCLUDED_FILE_PATHS:
-
-            # checks if the file path is in the list of excluded file locations
-            if lower_file_path.find(correct_file_name) > -1:
-                return False
+        # checks if the file path is in the list of excluded file locations
+        return not self._excluded_file_path_matcher.has_match(lower_file_path)
 
-        return True
-
-    def _is_podcast(self, file_path):
+    @staticmethod
+    def _is_podcast(probe_record):
         """Returns True if the audio file is relevant.
         Searches for predefined patterns in the ID3 Tags of the audio files.
 
         """
 
-        try:
-            # returns the current ID3 Tags of the audio file
-            self._current_tiny_tag = tinytag.TinyTag.get(file_path)
-        except:
-            self._current_tiny_tag = None
-
-        if self._current_tiny_tag:
-
-            # checks if the ID3 Tag track is empty
-            if self._current_tiny_tag.track:
-                return False
-
-            # checks if the ID3 Tag album artist is empty
-            if self._current_tiny_tag.albumartist:
-                return False
+        # checks if the ID3 Tag track is empty
+        if probe_record.track:
+            return False
 
-            # checks if the ID3 Tag title is empty
-            return not self._current_tiny_tag.title
-        else:
-            self._is_current_file_correct = False
+        # checks if the ID3 Tag album artist is empty
+        if probe_record.album_artist:
             return False
 
+        # checks if the ID3 Tag title is empty
+        return not probe_record.title
+
     @staticmethod
-    def _get_creation_date_timestamp(file_path):
+    def _get_creation_date_timestamp(file_stat):
         """Returns the creation date as timestamp of the audio file.
 
         """
 
-        file_stat = os.stat(file_path)
-
         # the lowest value of all 3 timestamps types (modification / creation date ...) is used for further processing
         min_time_stamp = min(file_stat.st_atime, file_stat.st_mtime, file_stat.st_ctime)
         return int(min_time_stamp)
 
     @staticmethod
-    def _get_file_id(file_path):
-        """Calculates the file id (hash value) for each audio file.
+    def _get_file_id_scheme():
+        """Returns the calculation (mode and hash algorithm) of the file ids.
+        The hash algorithm is the algorithm which is really used, if the library xxhash is not installed.
+
+        """
+
+        hash_algorithm = configuration.DATA_FILTERING_FILE_ID_ALGORITHM
+
+        if hash_algorithm == 'xxhash' and not xxhash:
+            hash_algorithm = 'blake2b'
+        elif hash_algorithm not in ('blake2b', 'xxhash'):
+            hash_algorithm = 'md5'
+
+        return f"{configuration.DATA_FILTERING_FILE_ID_MODE}:{hash_algorithm}"
+
+    def _has_stored_file_id(self, manifest_entry):
+        """Returns True if the manifest entry contains a file id of the current calculation of the file ids.
+        Manifest entries of older file scans contain no calculation, their file ids are calculated again.
+
+        """
+
+        return manifest_entry[3] is not None and len(manifest_entry) > 5 and \
+            manifest_entry[5] == self._get_file_id_scheme()
+
+    def _set_stored_file_id(self, manifest_entry, file_id):
+        """Stores the file id and the calculation of the file id in the manifest entry.
 
         """
 
+        # manifest entries of older file scans contain no stream attributes
+        manifest_entry.extend([None] * (6 - len(manifest_entry)))
+
+        manifest_entry[3] = file_id
+        manifest_entry[5] = self._get_file_id_scheme()
+
+    @staticmethod
+    def _new_hash_function():
+        """Returns a new hash function for the calculation of the file id.
+        Falls back to BLAKE2b, if the library xxhash is not installed.
+
+        """
+
+        hash_algorithm = configuration.DATA_FILTERING_FILE_ID_ALGORITHM
+
+        if hash_algorithm == 'xxhash' and xxhash:
+            return xxhash.xxh3_128()
+
+        if hash_algorithm in ('blake2b', 'xxhash'):
+            # the digest size of 16 bytes keeps the file ids as long as the MD5 file ids
+            return hashlib.blake2b(digest_size=16)
+
         # MD5 hash algorithm
-        md5_id = hashlib.md5()
-        with open(file_path, 'rb') as file:
-            buffer = file.read(configuration.DATA_FILTERING_MD5_HASH_BYTES)
+        return hashlib.md5()
+
+    @staticmethod
+    def _get_hash_buffer():
+        """Returns a reusable read buffer of the current thread.
+
+        """
+
+        if not hasattr(_thread_data, 'hash_buffer'):
+            _thread_data.hash_buffer = bytearray(max(configuration.DATA_FILTERING_HASH_BUFFER_BYTES,
+                                                     configuration.DATA_FILTERING_MD5_HASH_BYTES))
 
-        md5_id.update(buffer)
-        return md5_id.hexdigest()
+        return memoryview(_thread_data.hash_buffer)
+
+    @staticmethod
+    def _read_buffer(file, buffer):
+        """Reads bytes until the buffer is full or the end of the file is reached.
+        Unbuffered reads can return fewer bytes than requested, e.g. on network shares.
+        Returns the number of read bytes.
+
+        """
+
+        read_byte_number = 0
+
+        while read_byte_number < len(buffer):
+            byte_number = file.readinto(buffer[read_byte_number:])
+
+            if not byte_number:
+                break
+
+            read_byte_number += byte_number
+
+        return read_byte_number
+
+    def _calculate_file_id(self, file_path):
+        """Calculates the file id (hash value) of the audio file.
+        Returns the file id and the number of read bytes.
+
+        """
+
+        file_id_mode = configuration.DATA_FILTERING_FILE_ID_MODE
+        head_size = configuration.DATA_FILTERING_MD5_HASH_BYTES
+
+        hash_function = self._new_hash_function()
+        buffer = self._get_hash_buffer()
+        read_byte_number = 0
+
+        with open(file_path, 'rb', buffering=0) as file:
+
+            if file_id_mode == 'full':
+                # streams the whole file through the hash function
+                while True:
+                    byte_number = file.readinto(buffer)
+
+                    if not byte_number:
+                        break
+
+                    hash_function.update(buffer[:byte_number])
+                    read_byte_number += byte_number
+            else:
+                # the first bytes of the audio file
+                byte_number = self._read_buffer(file, buffer[:head_size])
+                hash_function.update(buffer[:byte_number])
+                read_byte_number += byte_number
+
+                if file_id_mode == 'hybrid':
+                    file_size = os.fstat(file.fileno()).st_size
+
+                    # the last bytes and the file size of the audio file
+                    file.seek(max(file_size - head_size, byte_number))
+                    byte_number = self._read_buffer(file, buffer[:head_size])
+                    hash_function.update(buffer[:byte_number])
+                    hash_function.update(file_size.to_bytes(8, 'little'))
+                    read_byte_number += byte_number
+
+        return hash_function.hexdigest(), read_byte_number
+
+    def _get_file_id(self, file_path):
+        """Calculates the file id (hash value) for each audio file.
+
+        """
+
+        file_id, _read_byte_number = self._calculate_file_id(file_path)
+        return file_id
+
+    def _identify_files(self, filtered_walk):
+        """Calculates the file ids of new or modified audio files in parallel.
+        The file ids are stored in the file manifest.
+
+        """
+
+        file_batch = []
+
+        with concurrent.futures.ThreadPoolExecutor(configuration.DATA_FILTERING_HASH_THREADS) as executor:
+
+            for file_tuple in filtered_walk:
+                file_batch.append(file_tuple)
+
+                if len(file_batch) >= configuration.DATA_FILTERING_SCAN_BATCH_SIZE:
+                    self._identify_file_batch(file_batch, executor)
+                    yield from file_batch
+                    file_batch = []
+
+            if file_batch:
+                self._identify_file_batch(file_batch, executor)
+                yield from file_batch
+
+    def _identify_file_batch(self, file_batch, executor):
+        """Calculates the file ids of a list of audio files in parallel.
+
+        """
+
+        file_path_list = [file_path for _file_name, file_path, _file_stat in file_batch
+                          if not self._has_stored_file_id(self._file_manifest[file_path])]
+
+        start_time = time.perf_counter()
+
+        for file_path, (file_id, read_byte_number) in zip(file_path_list,
+                                                          executor.map(self._calculate_file_id, file_path_list),
+                                                          strict=True):
+            self._set_stored_file_id(self._file_manifest[file_path], file_id)
+            self._hashed_byte_counter += read_byte_number
+
+        self._hashing_seconds += time.perf_counter() - start_time
+
+    def get_hashing_throughput(self):
+        """Returns the throughput (MB/s) of the file id calculation of the last data filtering process.
+
+        """
+
+        if not self._hashing_seconds:
+            return 0.0
+
+        return self._hashed_byte_counter / (1024 * 1024) / self._hashing_seconds
+
+    def _get_stored_file_id(self, file_path):
+        """Returns the file id of the audio file.
+        The file id is only calculated for new or modified audio files.
+
+        """
+
+        manifest_entry = self._file_manifest[file_path]
+
+        if not self._has_stored_file_id(manifest_entry):
+            self._set_stored_file_id(manifest_entry, self._get_file_id(file_path))
+
+        return manifest_entry[3]
 
     @staticmethod
     def _get_file_type(file_path):
@@ -195,99 +557,452 @@ class DataFiltering:
 
         return os.path.splitext(file_path)[1][1:].lower()
 
+    def _start_backup(self):
+        """Starts the thread pool which stores the audio files in the backup location.
+
+        """
+
+        os.makedirs(configuration.DATA_FILTERING_STORAGE_DICTIONARY, exist_ok=True)
+
+        self._backup_executor = concurrent.futures.ThreadPoolExecutor(configuration.DATA_FILTERING_BACKUP_THREADS)
+        self._backup_futures = set()
+
+    def _finish_backup(self):
+        """Waits until all audio files are stored in the backup location.
+
+        """
+
+        self._backup_executor.shutdown(wait=True)
+
+        # raises the first error of the backup process
+        for future in self._backup_futures:
+            future.result()
+
+    @staticmethod
+    def _reflink_file(from_path, to_path):
+        """Creates a copy-on-write clone of the audio file.
+        Only supported by file systems like Btrfs or XFS on Linux.
+
+        """
+
+        if not fcntl:
+            raise OSError("Reflinks are not supported on this operating system.")
+
+        with open(from_path, 'rb') as from_file, open(to_path, 'wb') as to_file:
+            fcntl.ioctl(to_file.fileno(), FICLONE, from_file.fileno())
+
+    def _store_backup_file(self, from_path, to_path):
+        """Stores the audio file in the backup location with the configured backup method.
+        Falls back to a full copy, if the file system does not support the backup method.
+
+        """
+
+        backup_method = configuration.DATA_FILTERING_BACKUP_METHOD
+
+        if backup_method in ('reflink', 'auto'):
+            try:
+                self._reflink_file(from_path, to_path)
+                return
+            except OSError:
+                with contextlib.suppress(OSError):
+                    os.remove(to_path)
+
+        # hard links are never chosen by 'auto', they share the content with the original audio file
+        if backup_method == 'hardlink':
+            try:
+                os.link(from_path, to_path)
+                return
+            except OSError:
+                pass
+
+        # copies the file in the backup location
+        shutil.copyfile(from_path, to_path)
+
     def _backup_file(self, from_path, file_id, file_type):
         """Stores the indexed audio file in the backup location.
+        The audio files are stored in parallel by a bounded thread pool.
 
         """
 
         # renames the audio file with the file id (hash value) for storing
         new_file_path = f'{configuration.DATA_FILTERING_STORAGE_DICTIONARY}\\{file_id}.{file_type}'
 
+        # the backup location is content-addressed, so audio files which are already stored are skipped
         if not os.path.isfile(new_file_path):
-            # copies the file in the backup location
-            shutil.copyfile(from_path, new_file_path)
+
+            # limits the number of waiting audio files
+            if len(self._backup_futures) >= 2 * configuration.DATA_FILTERING_BACKUP_THREADS:
+                done_futures, self._backup_futures = concurrent.futures.wait(
+                    self._backup_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done_futures:
+                    future.result()
+
+            self._backup_futures.add(self._backup_executor.submit(self._store_backup_file, from_path, new_file_path))
+
+    def _scan_dictionary(self, dir_path):
+        """Lists one folder of the file archive and returns its sub folders and files.
+        The file attributes of the directory entries are reused by the filtering process.
+
+        """
+
+        dir_path_list = []
+        file_entry_list = []
+
+        try:
+            with os.scandir(dir_path) as dir_entries:
+                for dir_entry in dir_entries:
+                    try:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            dir_path_list.append(dir_entry.path)
+                        elif dir_entry.is_file():
+                            file_stat = None
+
+                            # only the audio files need the file attributes for the filtering process
+                            if self._has_supported_extension(dir_entry.name):
+                                file_stat = dir_entry.stat()
+
+                            file_entry_list.append((dir_entry.name, dir_entry.path, file_stat))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+        return dir_path_list, file_entry_list
 
     def _dictionary_walk(self):
         """Iterates over the file archive and returns a list of found files.
+        The folders of the file archive are listed in parallel by a thread pool.
+
+        """
+
+        with concurrent.futures.ThreadPoolExecutor(configuration.DATA_FILTERING_SCAN_THREADS) as executor:
+            root_future = executor.submit(self._scan_dictionary, configuration.DATA_FILTERING_START_DICTIONARY)
+            pending_futures = {root_future}
+
+            try:
+                while pending_futures:
+                    done_futures, pending_futures = concurrent.futures.wait(
+                        pending_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                    for future in done_futures:
+                        dir_path_list, file_entry_list = future.result()
+
+                        # each ingestion machine (shard) only scans its own sub folders of the start folder
+                        if future is root_future and configuration.DATA_FILTERING_SHARD_NUMBER > 1 and \
+                                configuration.DATA_FILTERING_SHARD_MODE == 'path':
+                            dir_path_list = [dir_path for dir_path in dir_path_list if
+                                             self._is_shard_dictionary(dir_path)]
+
+                            # the files of the start folder are scanned by the first ingestion machine
+                            if configuration.DATA_FILTERING_SHARD_INDEX != 0:
+                                file_entry_list = []
+
+                        # the sub folders are listed by the next free thread
+                        for dir_path in dir_path_list:
+                            pending_futures.add(executor.submit(self._scan_dictionary, dir_path))
+
+                        yield from file_entry_list
+            finally:
+                # stops the file scan, when the data filtering process ends early
+                for future in pending_futures:
+                    future.cancel()
+
+    def _filter_tagged_files(self, file_batch, executor):
+        """Reads the ID3 Tags of a list of audio files in parallel and returns all relevant audio files.
+        The ID3 Tags of unchanged audio files are taken from the last file scan.
 
         """
 
-        for dir_path, _dir_names, files in os.walk(configuration.DATA_FILTERING_START_DICTIONARY):
+        changed_file_batch = [(file_path, file_stat) for _file_name, file_path, file_stat in file_batch
+                              if not self._is_unchanged_file(file_path, file_stat)]
+
+        changed_file_path_list = [file_path for file_path, _file_stat in changed_file_batch]
+
+        probe_record_list = self._tag_prober.probe_batch(changed_file_path_list, executor)
+
+        for (file_path, file_stat), probe_record in zip(changed_file_batch, probe_record_list, strict=True):
 
-            for file_name in files:
-                file_path = os.path.join(dir_path, file_name)
+            # audio files with unreadable ID3 Tags are marked with None
+            is_podcast = self._is_podcast(probe_record) if probe_record.is_readable else None
 
-                self._is_current_file_correct = True
+            # the stream attributes are only stored if the header of the audio file contains all of them
+            if probe_record.duration is not None and probe_record.sample_rate and probe_record.channels:
+                stream_info = [probe_record.duration, probe_record.sample_rate, probe_record.channels,
+                               probe_record.is_exact_duration]
+            else:
+                stream_info = None
+
+            # the file id is calculated later for relevant audio files only
+            self._file_manifest[file_path] = [file_stat.st_size, file_stat.st_mtime_ns, is_podcast, None,
+                                              stream_info, None]
+
+        for file_name, file_path, file_stat in file_batch:
+
+            is_podcast = self._file_manifest[file_path][2]
+
+            # audio files with unreadable ID3 Tags are filtered out from the data set
+            if is_podcast is None:
+                continue
 
-                yield (file_name, file_path)
+            has_correct_file_name = self._has_correct_file_name(file_name)
+
+            if is_podcast or has_correct_file_name:
+
+                has_not_wrong_file_name = self._has_not_wrong_file_name(file_name)
+
+                if has_not_wrong_file_name:
+                    yield (file_name, file_path, file_stat)
+                else:
+                    pass
+            else:
+                pass
 
     def _filter_files(self, file_walk):
         """Iterates over the file archive and returns a list of relevant audio files.
 
         """
 
-        for file_name, file_path in file_walk:
+        file_batch = []
 
-            if self._has_supported_extension(file_name):
+        with concurrent.futures.ThreadPoolExecutor(configuration.DATA_FILTERING_SCAN_THREADS) as executor:
+
+            for file_name, file_path, file_stat in file_walk:
 
-                if self._has_supported_file_size(file_path):
+                # audio files of other ingestion machines (shards) are skipped before they are read
+                if self._has_supported_extension(file_name) and self._has_supported_file_size(file_stat) and \
+                        self._has_not_wrong_path(file_path) and self._is_shard_path(file_path):
 
-                    if self._has_not_wrong_path(file_path):
+                    # the ID3 Tags are read in batches
+                    file_batch.append((file_name, file_path, file_stat))
 
-                        is_podcast = self._is_podcast(file_path)
-                        has_correct_file_name = self._has_correct_file_name(file_name)
+                    if len(file_batch) >= configuration.DATA_FILTERING_SCAN_BATCH_SIZE:
+                        yield from self._filter_tagged_files(file_batch, executor)
+                        file_batch = []
 
-                        if is_podcast or has_correct_file_name:
+            if file_batch:
+                yield from self._filter_tagged_files(file_batch, executor)
+
+    def _get_stream_info(self, file_path):
+        """Returns the duration, the sampling frequency, the number of channels of the audio file header and whether
+        the duration is exact. Returns None if the header was not probed or is incomplete.
+
+        """
 
-                            has_not_wrong_file_name = self._has_not_wrong_file_name(file_name)
+        manifest_entry = self._file_manifest.get(file_path)
+
+        # manifest entries of older file scans contain no stream attributes
+        if manifest_entry and len(manifest_entry) > 4:
+            return manifest_entry[4]
+
+        return None
+
+    def _add_file(self, file_id, file_name, file_path, file_stat):
+        """Adds a relevant audio file to the database and stores it in the backup location.
+
+        """
 
-                            if has_not_wrong_file_name:
-                                yield (file_name, file_path)
-                            else:
-                                pass
-                        else:
-                            pass
+        creation_date_timestamp = self._get_creation_date_timestamp(file_stat)
+        file_type = self._get_file_type(file_path)
+        stream_info = self._get_stream_info(file_path)
+
+        self._backup_file(file_path, file_id, file_type)
+
+        # all relevant audio files are stored into a dictionary (hash map)
+        self._file_dictionary[file_id] = [
+            file_path, file_name, file_type,
+            creation_date_timestamp, stream_info]
+
+    def get_replaced_file_ids(self):
+        """Returns the file ids of the entries which the last file scan removed, because the audio file was modified
+        or its file id is calculated differently. They have to be removed from the following data processing steps.
+
+        """
+
+        return self._replaced_file_id_list
 
     def update_database(self):
         """Locates all relevant audio files in the hard disc.
 
         """
 
-        os.makedirs(configuration.DATA_FILTERING_STORAGE_DICTIONARY, exist_ok=True)
+        self._start_backup()
+
+        self._hashed_byte_counter = 0
+        self._hashing_seconds = 0.0
 
         # returns a list of files
         file_walk = self._dictionary_walk()
 
-        # returns a list of relevant audio files
-        filtered_walk = self._filter_files(file_walk)
+        try:
+            # returns a list of relevant audio files
+            identified_file_list = list(self._identify_files(self._filter_files(file_walk)))
+
+            # calculates the file id for every new or modified audio file
+            current_file_ids = {file_path: self._get_stored_file_id(file_path) for _file_name, file_path, _file_stat
+                                in identified_file_list}
 
-        for file_name, file_path in filtered_walk:
+            # the old entries of audio files whose file id changed are removed first
+            self._replaced_file_id_list = self._remove_replaced_files(identified_file_list, current_file_ids)
+
+            for file_name, file_path, file_stat in identified_file_list:
+
+                file_id = current_file_ids[file_path]
+
+                # defines the maximum number of audio files in this processing step
+                self._added_file_counter += 1
+
+                if self._added_file_counter < configuration.DATA_FILTERING_MAX_FILES:
+
+                    # checks if the file is already in the database
+                    if file_id not in self._file_dictionary:
+                        self._add_file(file_id, file_name, file_path, file_stat)
+                    else:
+                        pass
+                else:
+                    return True
+        finally:
+            # waits until all audio files are stored in the backup location
+            self._finish_backup()
+
+            _logger.info("Hashed %.1f MB for the file ids (%.1f MB/s)", self._hashed_byte_counter / (1024 * 1024),
+                         self.get_hashing_throughput())
+
+    def _remove_replaced_files(self, file_walk, current_file_ids):
+        """Removes the entries of older versions of modified audio files from the database.
+        Audio files which are no longer relevant are removed as well. Returns the file ids of the removed entries.
+
+        """
+
+        stored_file_ids = {file_info[0]: file_id for file_id, file_info in self._file_dictionary.items()}
+
+        replaced_file_id_list = []
+
+        for _file_name, file_path, _file_stat in file_walk:
+            stored_file_id = stored_file_ids.get(file_path)
+
+            if stored_file_id and current_file_ids.get(file_path) != stored_file_id:
+                del self._file_dictionary[stored_file_id]
+                replaced_file_id_list.append(stored_file_id)
+
+        return replaced_file_id_list
+
+    def _remove_deleted_files(self, removed_path_list):
+        """Removes the entries of audio files which were deleted or moved out of their folder from the database.
+        A removed folder removes all audio files below it. Returns the file ids of the removed entries.
+
+        """
 
-            # calculates the file id for every audio file
-            file_id = self._get_file_id(file_path)
+        removed_path_tuple = tuple(removed_path_list)
+        removed_dir_tuple = tuple(os.path.join(removed_path, '') for removed_path in removed_path_list)
 
-            # defines the maximum number of audio files in this processing step
-            self._added_file_counter += 1
+        removed_file_id_list = []
 
-            if self._added_file_counter < configuration.DATA_FILTERING_MAX_FILES:
+        for file_id, file_info in list(self._file_dictionary.items()):
+            if file_info[0] in removed_path_tuple or file_info[0].startswith(removed_dir_tuple):
+                del self._file_dictionary[file_id]
+                removed_file_id_list.append(file_id)
+
+        for file_path in list(self._file_manifest):
+            if file_path in removed_path_tuple or file_path.startswith(removed_dir_tuple):
+                del self._file_manifest[file_path]
+
+        return removed_file_id_list
+
+    def update_database_from_paths(self, file_path_list):
+        """Adds a list of new, modified or removed files to the database.
+        Returns a dictionary (hash map) with the new relevant audio files and the file ids of the replaced entries of
+        modified or removed audio files, which have to be removed from the following data processing steps.
+
+        """
+
+        self._start_backup()
+
+        file_walk = []
+        removed_path_list = []
+
+        for file_path in file_path_list:
+            file_name = os.path.basename(file_path)
+
+            if not os.path.lexists(file_path):
+                removed_path_list.append(file_path)
+                continue
+
+            if self._has_supported_extension(file_name):
+                with contextlib.suppress(OSError):
+                    file_walk.append((file_name, file_path, os.stat(file_path)))
+
+        new_file_dictionary = {}
+
+        try:
+            identified_file_list = list(self._identify_files(self._filter_files(file_walk)))
+
+            current_file_ids = {file_path: self._get_stored_file_id(file_path) for _file_name, file_path, _file_stat
+                                in identified_file_list}
+
+            # the old entries are removed first, so audio files which swapped their content are added again
+            replaced_file_id_list = self._remove_replaced_files(file_walk, current_file_ids)
+            replaced_file_id_list.extend(self._remove_deleted_files(removed_path_list))
+
+            for file_name, file_path, file_stat in identified_file_list:
+
+                file_id = current_file_ids[file_path]
 
                 # checks if the file is already in the database
                 if file_id not in self._file_dictionary:
+                    self._add_file(file_id, file_name, file_path, file_stat)
 
-                    creation_date_timestamp = self._get_creation_date_timestamp(file_path)
-                    file_type = self._get_file_type(file_path)
+                    new_file_dictionary[file_id] = self._file_dictionary[file_id]
+        finally:
+            # waits until all audio files are stored in the backup location
+            self._finish_backup()
 
-                    if self._is_current_file_correct:
+        return new_file_dictionary, replaced_file_id_list
 
-                        self._backup_file(file_path, file_id, file_type)
+    def _poll_files(self):
+        """Lists the file archive periodically and returns batches of new or modified audio files.
+        Audio files are only reported, when they did not change between two listings.
 
-                        # all relevant audio files are stored into a dictionary (hash map)
-                        self._file_dictionary[file_id] = [
-                            file_path, file_name, file_type,
-                            creation_date_timestamp]
-                    else:
-                        pass
-                else:
-                    pass
-            else:
-                return True
+        """
+
+        previous_file_dictionary = {}
+
+        while True:
+            current_file_dictionary = {}
+            file_path_list = []
+
+            for _file_name, file_path, file_stat in self._dictionary_walk():
+
+                if file_stat:
+                    current_file_dictionary[file_path] = (file_stat.st_size, file_stat.st_mtime_ns)
+
+                    # audio files which are still copied to the file archive are reported in the next listing
+                    if previous_file_dictionary.get(file_path) == current_file_dictionary[file_path] and \
+                            not self._is_unchanged_file(file_path, file_stat):
+                        file_path_list.append(file_path)
+
+            # audio files which disappeared since the last listing are reported as removed
+            file_path_list.extend(set(previous_file_dictionary).difference(current_file_dictionary))
+
+            previous_file_dictionary = current_file_dictionary
+
+            yield file_path_list
+
+            time.sleep(configuration.DATA_FILTERING_WATCH_POLL_SECONDS)
+
+    def watch_database(self):
+        """Observes the file archive and adds new or modified audio files to the database.
+        Returns a dictionary (hash map) with the new relevant audio files and the file ids of the replaced entries for
+        each batch of changed files.
+        Uses inotify if available and a periodic listing of the file archive otherwise.
+
+        """
+
+        if FileWatching.is_supported():
+            file_watcher = FileWatching(configuration.DATA_FILTERING_START_DICTIONARY)
+            file_path_walk = file_watcher.watch_files()
+        else:
+            file_path_walk = self._poll_files()
+
+        for file_path_list in file_path_walk:
+            yield self.update_database_from_paths(file_path_list)
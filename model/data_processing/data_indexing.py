@@ -11,22 +11,11 @@ class DataIndexing:
 
     _added_file_counter = 0
 
-    def update_database(self, file_database, audio_database, text_database):
-        """Merges all data sources into one data set and stores them into the retrieval system.
+    def _get_document_list(self, file_database, audio_database, text_database):
+        """Merges all data sources into one data set and returns the documents of the retrieval system.
 
         """
 
-        # creates a new location for the retrieval system whoosh
-        if not os.path.exists(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION):
-            os.mkdir(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION)
-
-        # creates or load a new whoosh index
-        index = whoosh_index.create_in(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
-                                       schema=configuration.DATA_INDEXING_WHOOSH_SCHEME,
-                                       indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME)
-
-        index_writer = index.writer()
-
         for file_id, file_info in text_database.items():
 
             self._added_file_counter += 1
@@ -35,13 +24,18 @@ class DataIndexing:
             if self._added_file_counter < configuration.DATA_INDEXING_MAX_FILES:
 
                 file_path, file_name, file_type, creation_date_milli_seconds = file_database[
-                    file_id]
+                    file_id][:4]
 
                 audio_part_list = audio_database[file_id]
 
-                for file_part, lemma_token_list, important_words, _pos_token_list, concept_list in file_info:
+                for file_content in file_info:
+                    file_part, lemma_token_list, important_words, _pos_token_list, concept_list = file_content[:5]
+
+                    # audio segments of older runs contain no word timings
+                    timing_list = file_content[5] if len(file_content) > 5 else []
+
                     counter, new_audio_file_path, new_audio_file_name, duration_milli_seconds, full_audio_duration = \
-                        audio_part_list[file_part]
+                        audio_part_list[file_part][:5]
 
                     lemma_speech_text = ' '.join(lemma_token_list)
                     important_words_text = ' '.join(important_words)
@@ -59,11 +53,85 @@ class DataIndexing:
                                           'audio_file_part': file_part,
                                           'speech_text': lemma_speech_text,
                                           'important_words': important_words_text,
-                                          'important_concepts': concept_text
+                                          'important_concepts': concept_text,
+                                          'token_timings': timing_list
                                           }
 
-                    # adds the new document into the retrieval system
-                    index_writer.add_document(**function_arguments)
+                    yield function_arguments
+
+    def update_database(self, file_database, audio_database, text_database):
+        """Merges all data sources into one data set and stores them into the retrieval system.
+
+        """
+
+        # creates a new location for the retrieval system whoosh
+        if not os.path.exists(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION):
+            os.mkdir(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION)
+
+        # creates or load a new whoosh index
+        index = whoosh_index.create_in(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
+                                       schema=configuration.DATA_INDEXING_WHOOSH_SCHEME,
+                                       indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME)
+
+        index_writer = index.writer()
+
+        for function_arguments in self._get_document_list(file_database, audio_database, text_database):
+
+            # adds the new document into the retrieval system
+            index_writer.add_document(**function_arguments)
+
+        # commit all changes
+        index_writer.commit()
+
+    def remove_database(self, file_id_list):
+        """Removes all audio segments of the given audio files from the existing retrieval system.
+
+        """
+
+        if not whoosh_index.exists_in(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
+                                      indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME):
+            return
+
+        index = whoosh_index.open_dir(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
+                                      indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME)
+
+        index_writer = index.writer()
+
+        for file_id in file_id_list:
+            index_writer.delete_by_term('file_id', file_id)
+
+        # commit all changes
+        index_writer.commit()
+
+    def add_database(self, file_database, audio_database, text_database):
+        """Adds a small batch of new data entries to the existing retrieval system.
+
+        """
+
+        # creates a new location for the retrieval system whoosh
+        if not os.path.exists(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION):
+            os.mkdir(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION)
+
+        # loads the existing whoosh index
+        if whoosh_index.exists_in(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
+                                  indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME):
+            index = whoosh_index.open_dir(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
+                                          indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME)
+        else:
+            index = whoosh_index.create_in(configuration.DATA_INDEXING_WHOOSH_INDEX_LOCATION,
+                                           schema=configuration.DATA_INDEXING_WHOOSH_SCHEME,
+                                           indexname=configuration.DATA_INDEXING_WHOOSH_INDEX_NAME)
+
+        index_writer = index.writer()
+
+        for function_arguments in self._get_document_list(file_database, audio_database, text_database):
+
+            # retrieval systems of older versions have no field for the word timings
+            if 'token_timings' not in index.schema:
+                function_arguments.pop('token_timings')
+
+            # replaces the document of the audio segment, if it is already in the retrieval system
+            index_writer.update_document(**function_arguments)
 
         # commit all changes
         index_writer.commit()
@@ -0,0 +1,188 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from campus_wave import configuration
+
+
+class FileWatching:
+    """This class observes the file archive with the inotify interface of the Linux kernel.
+    New, modified and removed files are reported as small batches of file paths.
+
+    """
+
+    # inotify event types (see: man 7 inotify)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, root_path):
+        """Initializes the inotify interface for the file archive.
+
+        """
+
+        self._root_path = root_path
+        self._watch_dictionary = {}
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._inotify_fd = self._libc.inotify_init1(os.O_CLOEXEC)
+
+        if self._inotify_fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+    @staticmethod
+    def is_supported():
+        """Returns True if the operating system provides the inotify interface.
+
+        """
+
+        if not sys.platform.startswith('linux'):
+            return False
+
+        library_name = ctypes.util.find_library('c')
+
+        if not library_name:
+            return False
+
+        return hasattr(ctypes.CDLL(library_name), 'inotify_init1')
+
+    def close(self):
+        """Closes the inotify interface.
+
+        """
+
+        os.close(self._inotify_fd)
+
+    def _add_watch(self, dir_path):
+        """Observes one folder of the file archive.
+
+        """
+
+        watch_descriptor = self._libc.inotify_add_watch(self._inotify_fd, os.fsencode(dir_path), self.WATCH_MASK)
+
+        if watch_descriptor >= 0:
+            self._watch_dictionary[watch_descriptor] = dir_path
+
+    def _add_watch_tree(self, dir_path):
+        """Observes a folder and all its sub folders.
+        Returns a list of files which already exist in these folders.
+
+        """
+
+        file_path_list = []
+
+        for current_path, _dir_names, file_names in os.walk(dir_path):
+            self._add_watch(current_path)
+
+            file_path_list.extend(os.path.join(current_path, file_name) for file_name in file_names)
+
+        return file_path_list
+
+    def _remove_watch_tree(self, dir_path):
+        """Stops observing a folder which was moved out of its location and all its sub folders.
+
+        """
+
+        for watch_descriptor, watch_path in list(self._watch_dictionary.items()):
+            if watch_path == dir_path or watch_path.startswith(os.path.join(dir_path, '')):
+                self._libc.inotify_rm_watch(self._inotify_fd, watch_descriptor)
+                del self._watch_dictionary[watch_descriptor]
+
+    def _read_events(self):
+        """Reads all pending inotify events and returns the changed file paths.
+        Removed files and folders are reported with their former path.
+        Returns None if the kernel event queue overflowed.
+
+        """
+
+        file_path_list = []
+
+        buffer = os.read(self._inotify_fd, 64 * 1024)
+        offset = 0
+
+        while offset < len(buffer):
+            watch_descriptor, event_mask, _cookie, name_length = self.EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self.EVENT_HEADER.size
+
+            file_name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+
+            if event_mask & self.IN_Q_OVERFLOW:
+                return None
+
+            # the watch of a removed folder was removed by the kernel
+            if event_mask & self.IN_IGNORED:
+                self._watch_dictionary.pop(watch_descriptor, None)
+                continue
+
+            dir_path = self._watch_dictionary.get(watch_descriptor)
+
+            if not dir_path or not file_name:
+                continue
+
+            file_path = os.path.join(dir_path, file_name)
+
+            if event_mask & self.IN_ISDIR and event_mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # new folders are observed as well, files copied before the watch started are reported directly
+                file_path_list.extend(self._add_watch_tree(file_path))
+            elif event_mask & self.IN_ISDIR and event_mask & self.IN_MOVED_FROM:
+                # the watches of a moved folder would report its files with the old path
+                self._remove_watch_tree(file_path)
+                file_path_list.append(file_path)
+            elif event_mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_MOVED_FROM | self.IN_DELETE):
+                file_path_list.append(file_path)
+
+        return file_path_list
+
+    def watch_files(self):
+        """Observes the file archive and returns batches of new, modified or removed file paths.
+        Events are collected until the file archive was quiet for a short period of time. A batch is returned after a
+        maximum waiting time, even if files are still changing (e.g. a running recording or a large copy).
+
+        """
+
+        self._add_watch_tree(self._root_path)
+
+        file_path_set = set()
+        batch_start_time = None
+
+        while True:
+            if file_path_set:
+                batch_age = time.monotonic() - batch_start_time
+                timeout = max(0.0, min(configuration.DATA_FILTERING_WATCH_SETTLE_SECONDS,
+                                       configuration.DATA_FILTERING_WATCH_MAX_BATCH_SECONDS - batch_age))
+            else:
+                timeout = None
+
+            readable_list, _writable_list, _error_list = select.select([self._inotify_fd], [], [], timeout)
+
+            if readable_list:
+                file_path_list = self._read_events()
+
+                if file_path_list is None:
+                    # the event queue overflowed, so the whole file archive is reported
+                    file_path_list = self._add_watch_tree(self._root_path)
+
+                if file_path_list and not file_path_set:
+                    batch_start_time = time.monotonic()
+
+                file_path_set.update(file_path_list)
+
+            if file_path_set and (not readable_list or time.monotonic() - batch_start_time >=
+                                  configuration.DATA_FILTERING_WATCH_MAX_BATCH_SECONDS):
+                yield sorted(file_path_set)
+                file_path_set = set()
@@ -77,6 +77,14 @@ class InformationExtraction:
         else:
             open(configuration.INFORMATION_EXTRACTION_STORAGE_FILE, 'a').close()
 
+    def remove_files(self, file_id_list):
+        """Removes the speech data of audio files from the database.
+
+        """
+
+        for file_id in file_id_list:
+            self._text_dictionary.pop(file_id, None)
+
     def _extract_keywords_from_path(self, file_path):
         """Extracts multiple keywords from the file path.
 
@@ -131,14 +139,18 @@ class InformationExtraction:
                         result_token_list = []
 
                         audio_part_list = audio_database[file_id]
-                        file_path, file_name, file_type, creation_date_timestamp = file_database[file_id]
+                        file_path, file_name, file_type, creation_date_timestamp = file_database[file_id][:4]
 
                         # extracts additional keywords of the file path
                         path_keywords = self._extract_keywords_from_path(file_path)
 
-                        for file_part, token_list in file_info:
+                        for speech_part in file_info:
+                            # audio segments of older runs contain no word timings
+                            file_part, token_list = speech_part[:2]
+                            timing_list = speech_part[2] if len(speech_part) > 2 else []
+
                             counter, new_audio_file_path, new_audio_file_name, duration_milli_seconds, \
-                            full_audio_duration = audio_part_list[file_part]
+                            full_audio_duration = audio_part_list[file_part][:5]
 
                             # checks if the audio segment will be classified as speech
                             if self._is_correct_speech_segment(token_list, duration_milli_seconds):
@@ -167,7 +179,8 @@ class InformationExtraction:
                                 important_words_list = list(set(noun_token_list))
 
                                 result_token_list.append(
-                                    [file_part, token_list, important_words_list, pos_token_list, concept_list])
+                                    [file_part, token_list, important_words_list, pos_token_list, concept_list,
+                                     timing_list])
                             else:
                                 pass
 
@@ -188,12 +201,14 @@ class InformationExtraction:
         for _file_id, file_info in self._text_dictionary.items():
 
             for index, file_content in enumerate(file_info):
-                file_part, token_list, important_words_list, pos_token_list, concept_list = file_content
+                file_part, token_list, important_words_list, pos_token_list, concept_list = file_content[:5]
 
                 # extracts the new concepts out of the keywords
                 new_concept_list = list(self._rdf_mapper.get_concept_set(important_words_list))
 
-                new_file_content = [file_part, token_list, important_words_list, pos_token_list, new_concept_list]
+                # the word timings are kept
+                new_file_content = [file_part, token_list, important_words_list, pos_token_list, new_concept_list,
+                                    *file_content[5:]]
                 file_info[index] = new_file_content
 
     def process_text_data(self):
@@ -214,7 +229,9 @@ class InformationExtraction:
             # defines the maximum number of audio files in this processing step
             if self._processed_file_counter < configuration.INFORMATION_EXTRACTION_MAX_FILES:
 
-                for file_part, _lemma_token_list, _important_words, pos_token_list, _concept_list in file_info:
+                for file_content in file_info:
+                    file_part, _lemma_token_list, _important_words, pos_token_list, _concept_list = file_content[:5]
+
                     # initializes the POS tagging algorithm
                     self._init_pos_tagging()
 
@@ -0,0 +1,292 @@
+import audioop
+import collections
+import contextlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+
+
+class PartContainer:
+    """This class writes all audio segments of one audio file into a new container of raw audio data.
+    The container only replaces an older container of the same audio file if it is committed.
+
+    """
+
+    # number of bytes which are read at the same time to change the sound volume of the container
+    GAIN_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, container_path, index_path, frame_rate, sample_width, channels, release_function):
+        """Creates a temporary container next to the final container.
+        The release function closes the memory map of the final container before it is replaced.
+
+        """
+
+        self._container_path = container_path
+        self._index_path = index_path
+        self._release_function = release_function
+
+        self._part_index = {'frame_rate': frame_rate, 'sample_width': sample_width, 'channels': channels,
+                            'parts': []}
+
+        # the temporary container is opened for every write, no file handle is left open if the conversion fails
+        self._temporary_path = f"{container_path}.tmp"
+        self._offset = 0
+
+        with open(self._temporary_path, 'wb'):
+            pass
+
+    def append_part(self, part_data):
+        """Appends the raw audio data of the next audio segment to the container.
+
+        """
+
+        with open(self._temporary_path, 'ab') as file:
+            file.write(part_data)
+
+        self._part_index['parts'].append([self._offset, len(part_data)])
+        self._offset += len(part_data)
+
+    def apply_gain(self, gain):
+        """Changes the sound volume of all audio segments of the container in place.
+
+        """
+
+        sample_width = self._part_index['sample_width']
+
+        with open(self._temporary_path, 'r+b') as file:
+            while block_data := file.read(self.GAIN_BLOCK_SIZE - self.GAIN_BLOCK_SIZE % sample_width):
+                file.seek(-len(block_data), os.SEEK_CUR)
+                file.write(audioop.mul(block_data, sample_width, gain))
+
+    def commit(self):
+        """Replaces the container and the index of the audio file on the hard disc.
+        The index is written last, so a reader never sees an index without its container.
+
+        """
+
+        with open(f"{self._index_path}.tmp", 'w', encoding="utf8") as file:
+            json.dump(self._part_index, file)
+
+        self._release_function()
+
+        os.replace(self._temporary_path, self._container_path)
+        os.replace(f"{self._index_path}.tmp", self._index_path)
+
+    def discard(self):
+        """Removes the temporary container.
+
+        """
+
+        os.remove(self._temporary_path)
+
+
+class PartStore:
+    """This class stores all audio segments of an audio file in one container of raw audio data instead of many
+    small wav files. An index with the offset and the length of every audio segment is stored next to the container.
+    The audio segments are read through memory maps without copying.
+
+    """
+
+    CONTAINER_FILE_TYPE = 'pcm'
+    INDEX_FILE_TYPE = 'json'
+
+    WAVE_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+    # file ids are hexadecimal hash values, other values could refer to files outside of the storage folder
+    FILE_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+    def __init__(self, storage_dictionary, cache_size):
+        """Initializes the part store of a folder and the cache of the opened containers.
+
+        """
+
+        self._storage_dictionary = storage_dictionary
+        self._cache_size = cache_size
+
+        self._container_cache = collections.OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def is_container_path(cls, file_path):
+        """Returns True if the file path of an audio segment refers to a container.
+
+        """
+
+        return file_path.endswith(f".{cls.CONTAINER_FILE_TYPE}")
+
+    def get_container_path(self, file_id):
+        """Returns the location of the container of an audio file.
+
+        """
+
+        return os.path.join(self._storage_dictionary, f"{file_id}.{self.CONTAINER_FILE_TYPE}")
+
+    def _get_index_path(self, file_id):
+        """Returns the location of the index of the container of an audio file.
+
+        """
+
+        return os.path.join(self._storage_dictionary, f"{file_id}.{self.INDEX_FILE_TYPE}")
+
+    def create_container(self, file_id, frame_rate, sample_width, channels):
+        """Returns a new container for the audio segments of an audio file.
+
+        """
+
+        return PartContainer(self.get_container_path(file_id), self._get_index_path(file_id), frame_rate,
+                             sample_width, channels, lambda: self._release_container(file_id))
+
+    def _release_container(self, file_id):
+        """Removes the container of an audio file from the cache and closes its memory map.
+        Windows can not replace or remove a file while it is mapped into memory.
+
+        """
+
+        with self._cache_lock:
+            cache_entry = self._container_cache.pop(file_id, None)
+
+        # audio segments which are still read keep the memory map open until they are released
+        if cache_entry and isinstance(cache_entry[1], mmap.mmap):
+            with contextlib.suppress(BufferError):
+                cache_entry[1].close()
+
+    def remove_container(self, file_id):
+        """Removes the container and the index of an audio file.
+
+        """
+
+        self._release_container(file_id)
+
+        for file_path in (self._get_index_path(file_id), self.get_container_path(file_id)):
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+
+    @classmethod
+    def is_file_id(cls, file_id):
+        """Returns True if the value has the format of a file id.
+
+        """
+
+        return bool(cls.FILE_ID_PATTERN.fullmatch(file_id))
+
+    def _open_container(self, file_id):
+        """Returns the memory map and the index of the container of an audio file.
+        Opened containers are cached, a container which was replaced on the hard disc is opened again.
+        Returns None if the container does not exist or the file id is not valid.
+
+        """
+
+        if not self.is_file_id(file_id):
+            return None
+
+        index_path = self._get_index_path(file_id)
+
+        try:
+            index_stat = os.stat(index_path)
+        except OSError:
+            return None
+
+        with self._cache_lock:
+            cache_entry = self._container_cache.get(file_id)
+
+            if cache_entry and cache_entry[0] == index_stat.st_mtime_ns:
+                self._container_cache.move_to_end(file_id)
+                return cache_entry[1], cache_entry[2]
+
+        with open(index_path, encoding="utf8") as file:
+            part_index = json.load(file)
+
+        with open(self.get_container_path(file_id), 'rb') as file:
+            # empty files can not be mapped into memory
+            if os.fstat(file.fileno()).st_size:
+                container_data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                container_data = b''
+
+        with self._cache_lock:
+            self._container_cache[file_id] = (index_stat.st_mtime_ns, container_data, part_index)
+
+            # the memory maps of old containers are closed as soon as no audio segment refers to them any more
+            while len(self._container_cache) > self._cache_size:
+                self._container_cache.popitem(last=False)
+
+        return container_data, part_index
+
+    def read_part(self, file_id, file_part):
+        """Returns the raw audio data of an audio segment as memory view without copying.
+        Returns None if the audio segment does not exist.
+
+        """
+
+        container = self._open_container(file_id)
+
+        if not container:
+            return None
+
+        container_data, part_index = container
+
+        if not 0 <= file_part < len(part_index['parts']):
+            return None
+
+        offset, length = part_index['parts'][file_part]
+
+        return memoryview(container_data)[offset:offset + length]
+
+    def get_part_format(self, file_id):
+        """Returns the sampling frequency, the sample resolution and the number of channels of a container.
+
+        """
+
+        container = self._open_container(file_id)
+
+        if not container:
+            return None
+
+        part_index = container[1]
+
+        return part_index['frame_rate'], part_index['sample_width'], part_index['channels']
+
+    def get_wave_header(self, file_id, data_length):
+        """Returns the wav file header of an audio segment of a container.
+
+        """
+
+        frame_rate, sample_width, channels = self.get_part_format(file_id)
+
+        return self.WAVE_HEADER.pack(b'RIFF', 36 + data_length, b'WAVE', b'fmt ', 16, 1, channels, frame_rate,
+                                     frame_rate * sample_width * channels, sample_width * channels,
+                                     sample_width * 8, b'data', data_length)
+
+    def get_wave_size(self, file_id, file_part):
+        """Returns the size of an audio segment of a container as wav file.
+        Returns None if the audio segment does not exist.
+
+        """
+
+        part_data = self.read_part(file_id, file_part)
+
+        if part_data is None:
+            return None
+
+        return self.WAVE_HEADER.size + len(part_data)
+
+    def read_wave_range(self, file_id, file_part, start, stop):
+        """Returns a byte range of an audio segment of a container as wav file.
+        Only the requested range of the audio segment is copied.
+        Returns None if the audio segment does not exist, e.g. the container was removed after the size request.
+
+        """
+
+        part_data = self.read_part(file_id, file_part)
+
+        if part_data is None:
+            return None
+
+        wave_header = self.get_wave_header(file_id, len(part_data))
+
+        header_size = len(wave_header)
+
+        return wave_header[start:stop] + part_data[max(0, start - header_size):max(0, stop - header_size)].tobytes()
@@ -0,0 +1,65 @@
+import re
+
+
+class PatternMatching:
+    """This class searches for a list of predefined patterns in a text.
+    All patterns are compiled into a single regular expression, so one pass over the text is sufficient.
+
+    """
+
+    def __init__(self, pattern_list):
+        """Compiles the list of patterns into a regular expression.
+
+        """
+
+        pattern_trie = self._build_pattern_trie(pattern_list)
+
+        if pattern_trie:
+            self._pattern_regex = re.compile(self._get_trie_regex(pattern_trie))
+        else:
+            # an empty list of patterns never matches
+            self._pattern_regex = re.compile(r'(?!)')
+
+    @staticmethod
+    def _build_pattern_trie(pattern_list):
+        """Converts the list of patterns into a prefix tree.
+        The empty key marks the end of a pattern.
+
+        """
+
+        pattern_trie = {}
+
+        for pattern in pattern_list:
+            current_node = pattern_trie
+
+            for char in pattern:
+                current_node = current_node.setdefault(char, {})
+
+            current_node[''] = {}
+
+        return pattern_trie
+
+    def _get_trie_regex(self, trie_node):
+        """Converts the prefix tree into a regular expression.
+        Patterns with a common prefix share the same branch of the regular expression.
+
+        """
+
+        # a shorter pattern already matches, so longer patterns with the same prefix are not needed
+        if '' in trie_node:
+            return ''
+
+        alternative_list = [re.escape(char) + self._get_trie_regex(child_node)
+                            for char, child_node in sorted(trie_node.items())]
+
+        if len(alternative_list) == 1:
+            return alternative_list[0]
+
+        return '(?:' + '|'.join(alternative_list) + ')'
+
+    def has_match(self, text):
+        """Returns True if one of the patterns occurs in the text.
+
+        """
+
+        return self._pattern_regex.search(text) is not None
@@ -0,0 +1,263 @@
+import math
+import wave
+
+import numpy
+
+
+class SampleBuffer:
+    """This class stores the raw audio data of an audio file as NumPy array.
+    The audio data is normalized in place and split into audio segments which share the memory of the buffer.
+
+    """
+
+    # NumPy data types of the supported sample resolutions (Bytes)
+    SAMPLE_TYPES = {2: numpy.int16, 4: numpy.int32}
+
+    # number of samples which are normalized at the same time
+    GAIN_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, samples, frame_rate, channels, start_frame=0):
+        """Wraps a one dimensional NumPy array of interleaved samples.
+        The start frame is the position of the first frame in the audio file.
+
+        """
+
+        self._samples = samples
+        self._frame_rate = frame_rate
+        self._channels = channels
+        self._start_frame = start_frame
+
+    @classmethod
+    def from_audio_segment(cls, audio_segment):
+        """Copies the raw audio data of an audio segment of the library PyDub into a new sample buffer.
+
+        """
+
+        sample_type = cls.SAMPLE_TYPES.get(audio_segment.sample_width)
+
+        if not sample_type:
+            raise ValueError(f"unsupported sample width: {audio_segment.sample_width}")
+
+        samples = numpy.frombuffer(audio_segment.raw_data, dtype=sample_type).copy()
+
+        return cls(samples, audio_segment.frame_rate, audio_segment.channels)
+
+    def get_samples(self):
+        """Returns the NumPy array of the sample buffer.
+
+        """
+
+        return self._samples
+
+    def get_frame_rate(self):
+        """Returns the sampling frequency of the sample buffer.
+
+        """
+
+        return self._frame_rate
+
+    def get_frame_count(self):
+        """Returns the number of frames (samples of all channels) of the sample buffer.
+
+        """
+
+        return len(self._samples) // self._channels
+
+    def get_duration(self):
+        """Returns the duration of the sample buffer in milliseconds.
+
+        """
+
+        return round(1000 * self.get_frame_count() / self._frame_rate)
+
+    def get_start(self):
+        """Returns the position of the sample buffer in the audio file in milliseconds.
+
+        """
+
+        return round(1000 * self._start_frame / self._frame_rate)
+
+    def get_max_amplitude(self):
+        """Returns the maximum possible amplitude of one sample.
+
+        """
+
+        return 2 ** (self._samples.itemsize * 8 - 1)
+
+    def get_rms(self):
+        """Returns the root mean square of all samples.
+        The value is truncated like the root mean square of the library PyDub.
+
+        """
+
+        if not len(self._samples):
+            return 0
+
+        square_sum = 0.0
+
+        # the squares are summed up block by block, so no full length copy of the samples is needed
+        for start in range(0, len(self._samples), self.GAIN_BLOCK_SIZE):
+            sample_block = self._samples[start:start + self.GAIN_BLOCK_SIZE].astype(numpy.float64)
+            square_sum += float(numpy.dot(sample_block, sample_block))
+
+        return int(math.sqrt(square_sum / len(self._samples)))
+
+    def get_dbfs(self):
+        """Returns the sound volume of the sample buffer in dBFS.
+
+        """
+
+        rms = self.get_rms()
+
+        if not rms:
+            return -math.inf
+
+        return 20 * math.log(rms / self.get_max_amplitude(), 10)
+
+    def apply_gain(self, gain_db):
+        """Changes the sound volume of the sample buffer in place.
+        Samples which exceed the sample resolution are clipped, the rounding matches the library PyDub.
+
+        """
+
+        factor = 10 ** (gain_db / 20)
+
+        sample_info = numpy.iinfo(self._samples.dtype)
+
+        for start in range(0, len(self._samples), self.GAIN_BLOCK_SIZE):
+            sample_block = self._samples[start:start + self.GAIN_BLOCK_SIZE]
+
+            float_block = sample_block * factor
+            numpy.clip(float_block, sample_info.min, sample_info.max, out=float_block)
+            numpy.floor(float_block, out=float_block)
+
+            sample_block[:] = float_block
+
+    def normalize(self, optimal_loudness):
+        """Changes the sound volume of the sample buffer to a standard value.
+
+        """
+
+        current_loudness = self.get_dbfs()
+
+        # silent audio files are not changed
+        if math.isinf(current_loudness):
+            return
+
+        self.apply_gain(abs(current_loudness) - abs(optimal_loudness))
+
+    def get_part(self, begin_milliseconds, end_milliseconds):
+        """Returns an audio segment of the sample buffer which shares the memory of the sample buffer.
+
+        """
+
+        begin_frame = min(int(begin_milliseconds * self._frame_rate / 1000), self.get_frame_count())
+        end_frame = min(int(end_milliseconds * self._frame_rate / 1000), self.get_frame_count())
+
+        samples = self._samples[begin_frame * self._channels:end_frame * self._channels]
+
+        return SampleBuffer(samples, self._frame_rate, self._channels, self._start_frame + begin_frame)
+
+    def split_parts(self, part_milliseconds, overlap_milliseconds):
+        """Splits the sample buffer into overlapping audio segments of a fixed duration.
+
+        """
+
+        duration_milliseconds = self.get_duration()
+
+        # calculates the number of audio segments of the audio file
+        part_number = int(duration_milliseconds / part_milliseconds) + 1
+
+        for index in range(part_number):
+            begin_part = index * part_milliseconds
+            end_part_plus = min((index + 1) * part_milliseconds + overlap_milliseconds, duration_milliseconds)
+
+            yield self.get_part(begin_part, end_part_plus)
+
+    def export_wav(self, file_path):
+        """Stores the sample buffer as wav file on the hard disc without copying the samples.
+
+        """
+
+        with wave.open(file_path, 'wb') as wave_file:
+            wave_file.setnchannels(self._channels)
+            wave_file.setsampwidth(self._samples.itemsize)
+            wave_file.setframerate(self._frame_rate)
+            wave_file.writeframes(memoryview(self._samples).cast('B'))
+
+    def _get_frame_features(self, frame_size):
+        """Returns the sound volume (dBFS) and the zero crossing rate of all analysis frames of the sample buffer.
+        The frames are analysed in blocks, so no full length copy of the samples is needed.
+
+        """
+
+        samples = self._samples.reshape(-1, self._channels)
+        frame_number = len(samples) // frame_size
+
+        energy_list = numpy.empty(frame_number)
+        zero_crossing_list = numpy.empty(frame_number)
+
+        block_frames = max(1, self.GAIN_BLOCK_SIZE // frame_size)
+
+        for start in range(0, frame_number, block_frames):
+            end = min(start + block_frames, frame_number)
+
+            # mixes down all channels of the analysis frames
+            frame_block = samples[start * frame_size:end * frame_size].mean(axis=1).reshape(-1, frame_size)
+
+            rms = numpy.sqrt(numpy.mean(numpy.square(frame_block), axis=1))
+            energy_list[start:end] = 20 * numpy.log10(numpy.maximum(rms, 1) / self.get_max_amplitude())
+
+            sign_block = frame_block >= 0
+            zero_crossing_list[start:end] = numpy.mean(sign_block[:, 1:] != sign_block[:, :-1], axis=1)
+
+        return energy_list, zero_crossing_list
+
+    def get_speech_regions(self, frame_milliseconds, energy_threshold, zero_crossing_threshold,
+                           min_silence_milliseconds, min_speech_milliseconds, padding_milliseconds):
+        """Returns the begin and the end (milliseconds) of all speech regions of the sample buffer.
+        A frame contains speech if it is loud enough and its zero crossing rate is low enough for voiced sounds.
+        Short pauses are part of the speech region, short speech regions (clicks, jingles) are ignored.
+
+        """
+
+        frame_size = max(1, int(self._frame_rate * frame_milliseconds / 1000))
+
+        energy_list, zero_crossing_list = self._get_frame_features(frame_size)
+
+        speech_mask = (energy_list >= energy_threshold) & (zero_crossing_list <= zero_crossing_threshold)
+
+        # finds the first and the last frame of all speech regions
+        edge_list = numpy.flatnonzero(numpy.diff(numpy.concatenate(([0], speech_mask.astype(numpy.int8), [0]))))
+        begin_list, end_list = edge_list[0::2], edge_list[1::2]
+
+        # joins speech regions which are separated by short pauses
+        if len(begin_list):
+            long_pause_mask = (begin_list[1:] - end_list[:-1]) * frame_milliseconds >= min_silence_milliseconds
+
+            begin_list = numpy.concatenate((begin_list[:1], begin_list[1:][long_pause_mask]))
+            end_list = numpy.concatenate((end_list[:-1][long_pause_mask], end_list[-1:]))
+
+        # removes short speech regions
+        long_speech_mask = (end_list - begin_list) * frame_milliseconds >= min_speech_milliseconds
+
+        begin_list = begin_list[long_speech_mask] * frame_milliseconds - padding_milliseconds
+        end_list = end_list[long_speech_mask] * frame_milliseconds + padding_milliseconds
+
+        duration_milliseconds = self.get_duration()
+
+        return [(max(0, int(begin)), min(duration_milliseconds, int(end)))
+                for begin, end in zip(begin_list, end_list, strict=True)]
+
+    def split_speech_parts(self, part_milliseconds, overlap_milliseconds, speech_region_list):
+        """Splits the speech regions of the sample buffer into audio segments.
+        Speech regions which are longer than one audio segment are split into overlapping audio segments.
+
+        """
+
+        for begin_region, end_region in speech_region_list:
+            speech_region = self.get_part(begin_region, end_region)
+
+            for audio_part in speech_region.split_parts(part_milliseconds, overlap_milliseconds):
+                if audio_part.get_frame_count():
+                    yield audio_part
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import math
+import os
+
+import pocketsphinx
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+
+class SpeechBackend:
+    """This class is the interface of the speech recognition frameworks (backends).
+    A backend recognizes the raw audio data (16 bit, mono) of an audio segment and returns the hypothesis segments
+    [word, probability, start frame, end frame]. The probabilities are logarithms in the scale of sphinx and the
+    frames are 10 milliseconds long, so all backends share the filtering of the speech recognition.
+
+    """
+
+    # name of the backend in the configuration
+    NAME: str | None = None
+
+    # number of frames per second of the hypothesis segments
+    FRAME_RATE = 100
+
+    def __init__(self, config):
+        """Loads the model of the backend.
+
+        """
+
+        self._config = config
+
+    def decode(self, pcm_data, buffer_size):
+        """Returns the hypothesis segments of the raw audio data of an audio segment.
+        The raw audio data is passed to the backend in blocks of the buffer size (bytes).
+
+        """
+
+        raise NotImplementedError
+
+    def get_fingerprint(self):
+        """Returns a fingerprint of the backend, its parameters and its model files.
+        The model files are identified by their size and their modification time, so they are not read.
+
+        """
+
+        fingerprint = hashlib.blake2b(self.NAME.encode("utf8"), digest_size=16)
+
+        for name, value in sorted(self._config.items()):
+            fingerprint.update(repr((name, value)).encode("utf8"))
+
+            if isinstance(value, str) and os.path.exists(value):
+                # models are often folders of model files
+                file_path_list = [os.path.join(dir_path, file_name) for dir_path, _dir_names, file_names in
+                                  os.walk(value) for file_name in file_names] if os.path.isdir(value) else [value]
+
+                for file_path in sorted(file_path_list):
+                    file_stat = os.stat(file_path)
+                    fingerprint.update(repr((file_path, file_stat.st_size, file_stat.st_mtime_ns)).encode("utf8"))
+
+        return fingerprint.hexdigest()
+
+
+class PocketSphinxBackend(SpeechBackend):
+    """This class recognizes speech with the framework sphinx (reference backend).
+
+    """
+
+    NAME = 'pocketsphinx'
+
+    def __init__(self, config):
+        """Loads the Hidden Markov Model, the Language Model and the Dictionary of sphinx.
+
+        """
+
+        super().__init__(config)
+
+        self._pocket_sphinx = pocketsphinx.Pocketsphinx(**config)
+
+    def decode(self, pcm_data, buffer_size):
+        """Returns the hypothesis segments of sphinx of the raw audio data of an audio segment.
+
+        """
+
+        pcm_data = memoryview(pcm_data)
+
+        # sphinx processes
+        with self._pocket_sphinx.start_utterance():
+            for offset in range(0, len(pcm_data), buffer_size):
+                self._pocket_sphinx.process_raw(pcm_data[offset:offset + buffer_size], False, False)
+
+        # returns a list of different hypothesis
+        return [list(segment) for segment in self._pocket_sphinx.segments(detailed=True)]
+
+
+class VoskBackend(SpeechBackend):
+    """This class recognizes speech with the offline framework Vosk (Kaldi), which runs on the CPU only.
+    The library vosk is optional.
+
+    """
+
+    NAME = 'vosk'
+
+    # logarithm base of the probabilities of sphinx
+    LOG_BASE = 1.0001
+
+    def __init__(self, config):
+        """Loads the model of Vosk.
+
+        """
+
+        super().__init__(config)
+
+        if not vosk:
+            raise ImportError("the speech recognition backend 'vosk' requires the library vosk")
+
+        vosk.SetLogLevel(-1)
+
+        self._model = vosk.Model(config['model'])
+        self._sample_rate = config.get('sample_rate', 16000)
+
+    def _get_segment(self, word_result):
+        """Converts a recognized word of Vosk into a hypothesis segment in the scale of sphinx.
+
+        """
+
+        probability = int(math.log(max(word_result['conf'], 1e-10), self.LOG_BASE))
+
+        return [word_result['word'], probability, round(word_result['start'] * self.FRAME_RATE),
+                round(word_result['end'] * self.FRAME_RATE)]
+
+    def decode(self, pcm_data, buffer_size):
+        """Returns the hypothesis segments of Vosk of the raw audio data of an audio segment.
+
+        """
+
+        recognizer = vosk.KaldiRecognizer(self._model, self._sample_rate)
+        recognizer.SetWords(True)
+
+        pcm_data = memoryview(pcm_data)
+        result_list = []
+
+        for offset in range(0, len(pcm_data), buffer_size):
+            # Vosk returns the words of an utterance, when it detects the end of the utterance
+            if recognizer.AcceptWaveform(bytes(pcm_data[offset:offset + buffer_size])):
+                result_list.append(recognizer.Result())
+
+        result_list.append(recognizer.FinalResult())
+
+        return [self._get_segment(word_result) for result in result_list for word_result in
+                json.loads(result).get('result', [])]
+
+
+# backends which can be selected in the configuration
+SPEECH_BACKENDS = {backend.NAME: backend for backend in (PocketSphinxBackend, VoskBackend)}
+
+
+def create_speech_backend(backend_name, config):
+    """Returns a new backend of the speech recognition.
+
+    """
+
+    if backend_name not in SPEECH_BACKENDS:
+        raise ValueError(f"unknown speech recognition backend: {backend_name}")
+
+    return SPEECH_BACKENDS[backend_name](config)
@@ -1,9 +1,14 @@
+import concurrent.futures
+import contextlib
+import hashlib
 import json
-import multiprocessing
 import os
 
+import numpy
 from campus_wave import configuration
-import pocketsphinx
+
+from model.data_processing.audio_processing import AudioProcessing, convert_audio_file_parallel
+from model.data_processing.speech_backend import create_speech_backend
 
 
 class SpeechRecognition:
@@ -12,7 +17,8 @@ class SpeechRecognition:
 
     """
 
-    _speech_dictionary = {}
+    _speech_dictionary: dict[str, list] = {}
+    _segment_cache: dict[str, dict] = {}
     _added_file_counter = 0
 
     def get_database(self):
@@ -24,22 +30,31 @@ class SpeechRecognition:
 
     def store_database(self):
         """Stores the recognized speech of all audio segments to the hard disc.
-        The data set is stored as a JSON file.
+        The data set is stored as a JSON file, the recognition log is emptied afterwards.
 
         """
 
-        if not os.path.isfile(configuration.SPEECH_RECOGNITION_JSON_STORAGE_FILE):
-            open(configuration.SPEECH_RECOGNITION_JSON_STORAGE_FILE, 'a').close()
+        temporary_storage_file = f"{configuration.SPEECH_RECOGNITION_JSON_STORAGE_FILE}.tmp"
 
-        with open(configuration.SPEECH_RECOGNITION_JSON_STORAGE_FILE, 'w', encoding="utf8") as file:
+        with open(temporary_storage_file, 'w', encoding="utf8") as file:
             for key, value in self._speech_dictionary.items():
                 line_list = [key, value]
                 json_content = json.dumps(line_list)
                 file.write(f"{json_content}\n")
 
+            # the data set has to be on the hard disc before the recognition log is emptied
+            file.flush()
+            os.fsync(file.fileno())
+
+        # the recognition log is only emptied after the data set is completely stored
+        os.replace(temporary_storage_file, configuration.SPEECH_RECOGNITION_JSON_STORAGE_FILE)
+
+        open(configuration.SPEECH_RECOGNITION_LOG_FILE, 'w').close()
+
     def load_database(self):
         """Loads the recognized speech of all audio segments from the hard disc.
-        The data set is stored as a JSON file.
+        The data set is stored as a JSON file. Audio segments of the recognition log of an interrupted speech
+        recognition process are added to the data set and the data set is stored again (compacted).
 
         """
 
@@ -53,8 +68,175 @@ class SpeechRecognition:
         else:
             open(configuration.SPEECH_RECOGNITION_JSON_STORAGE_FILE, 'a').close()
 
+        if self._replay_log():
+            self.store_database()
+
+        self._load_segment_cache()
+
+    def remove_files(self, file_id_list):
+        """Removes the recognized speech and the cached decoder output of audio files.
+        The cache is stored immediately, the data set is stored by store_database.
+
+        """
+
+        removed_cache_number = 0
+
+        for file_id in file_id_list:
+            self._speech_dictionary.pop(file_id, None)
+
+            if self._segment_cache.pop(file_id, None) is not None:
+                removed_cache_number += 1
+
+        if removed_cache_number:
+            self._store_segment_cache()
+
+    def _load_segment_cache(self):
+        """Loads the decoder output of all recognized audio segments from the hard disc.
+        Each line contains the cache key (model fingerprint and audio hash), the file id, the number of the audio
+        segment and the hypothesis segments of the backend. Only the last line of an audio segment is kept.
+
+        """
+
+        if not os.path.isfile(configuration.SPEECH_RECOGNITION_SEGMENT_CACHE_FILE):
+            return
+
+        line_number = 0
+
+        with open(configuration.SPEECH_RECOGNITION_SEGMENT_CACHE_FILE, encoding="utf8") as file:
+            for one_line in file:
+                try:
+                    cache_key, file_id, part_counter, segment_list = json.loads(one_line)
+                except ValueError:
+                    break
+
+                self._segment_cache.setdefault(file_id, {})[part_counter] = [cache_key, segment_list]
+                line_number += 1
+
+        # removes outdated lines of audio segments which were recognized again
+        if line_number > sum(len(part_dictionary) for part_dictionary in self._segment_cache.values()):
+            self._store_segment_cache()
+
+    def _store_segment_cache(self):
+        """Stores the decoder output of all recognized audio segments to the hard disc.
+
+        """
+
+        temporary_cache_file = f"{configuration.SPEECH_RECOGNITION_SEGMENT_CACHE_FILE}.tmp"
+
+        with open(temporary_cache_file, 'w', encoding="utf8") as file:
+            for file_id, part_dictionary in self._segment_cache.items():
+                for part_counter, (cache_key, segment_list) in part_dictionary.items():
+                    json_content = json.dumps([cache_key, file_id, part_counter, segment_list])
+                    file.write(f"{json_content}\n")
+
+            # the old cache is only replaced by a completely written cache
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary_cache_file, configuration.SPEECH_RECOGNITION_SEGMENT_CACHE_FILE)
+
+    def _append_segment_cache(self, cache_file, file_id, part_counter, cache_key, segment_list):
+        """Appends the decoder output of one audio segment to the cache.
+        Audio segments whose decoder output was taken from the cache are not appended again.
+
+        """
+
+        if segment_list is None:
+            return
+
+        self._segment_cache.setdefault(file_id, {})[part_counter] = [cache_key, segment_list]
+
+        json_content = json.dumps([cache_key, file_id, part_counter, segment_list])
+        cache_file.write(f"{json_content}\n")
+
+    def _get_cache_entry(self, file_id, part_counter):
+        """Returns the cache key and the decoder output of an audio segment of a previous run or None.
+
+        """
+
+        return self._segment_cache.get(file_id, {}).get(part_counter)
+
+    def reapply_segment_cache(self):
+        """Filters the cached decoder output of all audio segments again, e.g. after the probability thresholds or
+        the meta information of sphinx were changed. Audio segments without decoder output are not changed.
+        Returns the file ids of the audio files whose recognized speech changed.
+
+        """
+
+        cached_file_part_list = []
+        segment_lists = []
+
+        for file_id, file_part_list in self._speech_dictionary.items():
+            part_dictionary = self._segment_cache.get(file_id, {})
+
+            for file_part in file_part_list:
+                cache_entry = part_dictionary.get(file_part[0])
+
+                if cache_entry:
+                    cached_file_part_list.append((file_id, file_part))
+                    segment_lists.append(cache_entry[1])
+
+        changed_file_id_set = set()
+
+        # all audio segments are filtered in one batch
+        for (file_id, file_part), (token_list, timing_list) in zip(cached_file_part_list,
+                                                                   filter_segment_lists(segment_lists), strict=True):
+            # audio segments of older runs without word timings get them, too
+            if file_part[1:] != [token_list, timing_list]:
+                file_part[1:] = [token_list, timing_list]
+                changed_file_id_set.add(file_id)
+
+        return list(changed_file_id_set)
+
+    def _replay_log(self):
+        """Adds the recognized audio segments of the recognition log to the dictionary (hash map).
+        Returns True if the recognition log contained audio segments.
+
+        """
+
+        if not os.path.isfile(configuration.SPEECH_RECOGNITION_LOG_FILE):
+            return False
+
+        changed_file_id_set = set()
+
+        with open(configuration.SPEECH_RECOGNITION_LOG_FILE, encoding="utf8") as file:
+            for one_line in file:
+                try:
+                    line_list = json.loads(one_line)
+                except ValueError:
+                    # the last line of the recognition log is incomplete, if the process was killed while writing
+                    break
+
+                # lines of older runs contain no word timings
+                file_id, recognized_part = line_list[0], line_list[1:]
+                part_counter = recognized_part[0]
+
+                # audio segments which were already stored in the data set are skipped
+                if file_id in self._speech_dictionary and any(
+                        file_part[0] == part_counter for file_part in self._speech_dictionary[file_id]):
+                    continue
+
+                self._speech_dictionary.setdefault(file_id, []).append(recognized_part)
+                changed_file_id_set.add(file_id)
+
+        self._sort_recognized_parts(changed_file_id_set)
+
+        return bool(changed_file_id_set)
+
+    @staticmethod
+    def _append_log(log_file, file_id, part_counter, token_list, timing_list):
+        """Appends the recognized speech of one audio segment to the recognition log.
+
+        """
+
+        json_content = json.dumps([file_id, part_counter, token_list, timing_list])
+        log_file.write(f"{json_content}\n")
+        log_file.flush()
+
     def _reduce_audio_database_parallel(self, audio_database):
         """Converts the dictionary (hash map) into a list of audio segments for the parallel speech recognition process.
+        Only audio segments without recognized speech are added, e.g. the remaining audio segments of an audio file
+        whose speech recognition was interrupted.
 
         """
 
@@ -68,60 +250,56 @@ class SpeechRecognition:
             if self._added_file_counter > configuration.SPEECH_RECOGNITION_MAX_FILES:
                 return result_list
 
-            # checks if the file is already in the database
-            if file_id not in self._speech_dictionary:
+            # the audio segments are recognized in the order of their duration, so an interrupted speech recognition
+            # leaves audio files with a part of their audio segments
+            recognized_part_set = self._get_recognized_part_set(file_id)
+
+            for file_part in file_list:
+                # audio segments of newer runs contain their position in the audio file
+                part_counter, new_file_path, new_file_name, duration, full_audio_duration = file_part[:5]
+
+                # checks if the audio segment is already in the database
+                if part_counter not in recognized_part_set:
 
-                for part_counter, new_file_path, new_file_name, duration, full_audio_duration in file_list:
                     # converts the dictionary into a list of audio segments
-                    result_list.append(((file_id, part_counter, new_file_path, new_file_name, duration,
-                                         full_audio_duration),
-                                        configuration.SPEECH_RECOGNITION_POCKET_SPHINX_CONFIG))
-            else:
-                pass
+                    result_list.append((file_id, part_counter, new_file_path, new_file_name, duration,
+                                        full_audio_duration, self._get_cache_entry(file_id, part_counter)))
 
         return result_list
 
-    def _store_temporary_results(self):
-        """Stores the recognized speech of all audio segments to the hard disc.
+    def _get_recognized_part_set(self, file_id):
+        """Returns the numbers of the audio segments of an audio file whose speech is already recognized.
 
         """
 
-        self.store_database()
-        self.load_database()
+        return {file_part[0] for file_part in self._speech_dictionary.get(file_id, [])}
 
-    def _build_partitions(self, tuple_list, partition_number):
-        """Creates multiple partitions (lists) for the parallel speech recognition process.
-        Each partition is separately processed.
+    def _add_recognized_part(self, file_id, part_counter, token_list, timing_list):
+        """Stores the recognized speech of an audio segment into the dictionary (hash map).
+        The timing list contains the start frame and the end frame of every word (flat list).
 
         """
 
-        tuple_list_len = len(tuple_list)
-
-        if tuple_list_len <= partition_number:
-            return [tuple_list]
-
-        return_list = []
-        temp_list = []
-
-        for index, tuple_elem in enumerate(tuple_list):
-
-            # checks if a new partition is created
-            if ((index + 1) % partition_number == 0) or ((index + 1) == tuple_list_len):
-
-                # adds the new audio segment to a temporary list
-                temp_list.append(tuple_elem)
+        if file_id in self._speech_dictionary:
+            self._speech_dictionary[file_id].append([part_counter, token_list, timing_list])
+        else:
+            self._speech_dictionary[file_id] = []
+            self._speech_dictionary[file_id].append([part_counter, token_list, timing_list])
 
-                # adds the partition (list of audio segments) to the final list.
-                return_list.append(temp_list)
+    def _sort_recognized_parts(self, file_id_set):
+        """Sorts the recognized audio segments of audio files by their position in the audio file.
+        The audio segments are recognized in the order of their duration, not in the order of the audio file.
 
-                temp_list = []
-            else:
-                temp_list.append(tuple_elem)
+        """
 
-        return return_list
+        for file_id in file_id_set:
+            self._speech_dictionary[file_id].sort(key=lambda file_part: file_part[0])
 
     def update_database_parallel(self, audio_database):
         """Starts a new parallel speech recognition process.
+        The longest audio segments are recognized first, so no core waits for one long audio segment at the end.
+        Every free core takes the next audio segment, the recognized speech is appended to the recognition log as
+        soon as it is finished.
 
         """
 
@@ -130,123 +308,383 @@ class SpeechRecognition:
 
         if reduced_file_part_list:
 
-            # initializes all processes for the parallel speech recognition
-            process_pool = multiprocessing.Pool(processes=configuration.SPEECH_RECOGNITION_CALCULATION_CORES)
+            # sorts the audio segments by their duration (longest first)
+            reduced_file_part_list.sort(key=lambda input_file_part_tuple: input_file_part_tuple[4], reverse=True)
 
-            # splits the list of audio segments into multiple partitions
-            partition_list = self._build_partitions(reduced_file_part_list,
-                                                    configuration.SPEECH_RECOGNITION_CALCULATION_BATCH_NUMBER)
+            changed_file_id_set = set()
 
-            partition_counter = 0
+            with self._start_process_pool() as executor, self._open_log_files() as (log_file, cache_file):
 
-            # each partition is separately processed.
-            for partition in partition_list:
+                result_list = _map_bounded(executor, extract_speech_from_file_parallel, reduced_file_part_list)
 
-                # maps the list of audio segments to a set of processes
-                result_file_part_list = process_pool.map(extract_speech_from_file_parallel, partition)
+                for result_counter, (file_id, part_counter, _new_file_path, _new_file_name, _duration_milli_seconds,
+                                     _full_audio_duration, token_list, timing_list, cache_key,
+                                     segment_list) in enumerate(result_list, start=1):
 
-                for file_id, part_counter, _new_file_path, _new_file_name, _duration_milli_seconds, \
-                    _full_audio_duration, token_list in result_file_part_list:
+                    # stores the recognized speech into a dictionary (hash map) and the recognition log
+                    self._add_recognized_part(file_id, part_counter, token_list, timing_list)
+                    self._append_segment_cache(cache_file, file_id, part_counter, cache_key, segment_list)
+                    self._append_log(log_file, file_id, part_counter, token_list, timing_list)
+                    changed_file_id_set.add(file_id)
 
-                    # stores the recognized speech into a dictionary (hash map)
-                    if file_id in self._speech_dictionary:
-                        self._speech_dictionary[file_id].append([part_counter, token_list])
-                    else:
-                        self._speech_dictionary[file_id] = []
-                        self._speech_dictionary[file_id].append([part_counter, token_list])
+                    # writes the recognition log to the hard disc regularly
+                    if result_counter % configuration.SPEECH_RECOGNITION_LOG_SYNC_PARTS == 0:
+                        self._sync_log_files(log_file, cache_file)
 
-                # stores the recognized speech
-                self._store_temporary_results()
+                self._sync_log_files(log_file, cache_file)
 
-                partition_counter += 1
+            self._sort_recognized_parts(changed_file_id_set)
 
         return True
 
+    def update_database_fused(self, audio_processing, file_database):
+        """Converts all new audio files and recognizes their speech in the same process (fused data processing).
+        The raw audio data of the audio segments is recognized directly after the conversion, so the audio segments
+        are not read again by a separate speech recognition process.
 
-_global_pocket_sphinx = pocketsphinx.Pocketsphinx(**configuration.SPEECH_RECOGNITION_POCKET_SPHINX_CONFIG)
+        """
 
+        reduced_file_list = audio_processing.reduce_file_database_parallel(file_database)
 
-def extract_speech_from_file_parallel(input_file_part_tuple):
-    """Recognizes the speech of an audio segment.
+        if reduced_file_list:
+
+            # sorts the audio files by the duration of their header (longest first)
+            reduced_file_list.sort(key=lambda input_file_tuple: (input_file_tuple[4] or [0])[0], reverse=True)
+
+            # audio segments whose speech was already recognized are only converted
+            input_file_list = [(input_file_tuple, self._get_recognized_part_set(input_file_tuple[0]),
+                                self._segment_cache.get(input_file_tuple[0], {})) for
+                               input_file_tuple in reduced_file_list]
+
+            with self._start_process_pool() as executor, self._open_log_files() as (log_file, cache_file):
+
+                result_list = _map_bounded(executor, convert_and_extract_speech_parallel, input_file_list)
+
+                for result_counter, (file_id, file_part_list, checksum_list, token_part_list) in enumerate(
+                        result_list, start=1):
+
+                    audio_processing.add_converted_file(file_id, file_part_list, checksum_list)
+
+                    # stores the recognized speech into a dictionary (hash map) and the recognition log
+                    for part_counter, token_list, timing_list, cache_key, segment_list in token_part_list:
+                        self._add_recognized_part(file_id, part_counter, token_list, timing_list)
+                        self._append_segment_cache(cache_file, file_id, part_counter, cache_key, segment_list)
+                        self._append_log(log_file, file_id, part_counter, token_list, timing_list)
+
+                    self._sync_log_files(log_file, cache_file)
+
+                    # stores the converted audio files
+                    if result_counter % configuration.AUDIO_PROCESSING_CHECKPOINT_FILES == 0:
+                        audio_processing.store_database()
+
+        return True
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_log_files():
+        """Opens the recognition log and the cache of the decoder output for appending.
+
+        """
+
+        with open(configuration.SPEECH_RECOGNITION_LOG_FILE, 'a', encoding="utf8") as log_file, \
+                open(configuration.SPEECH_RECOGNITION_SEGMENT_CACHE_FILE, 'a', encoding="utf8") as cache_file:
+            yield log_file, cache_file
+
+    @staticmethod
+    def _sync_log_files(log_file, cache_file):
+        """Writes the recognition log and the cache of the decoder output to the hard disc.
+        The cache is written first, so every audio segment of the recognition log has its decoder output.
+
+        """
+
+        cache_file.flush()
+        os.fsync(cache_file.fileno())
+        os.fsync(log_file.fileno())
+
+    @staticmethod
+    def _start_process_pool():
+        """Initializes all processes for the parallel speech recognition, each process loads its own backend.
+
+        """
+
+        return concurrent.futures.ProcessPoolExecutor(
+            configuration.SPEECH_RECOGNITION_CALCULATION_CORES, initializer=init_speech_recognition_process,
+            initargs=_get_backend_arguments())
+
+
+def _map_bounded(executor, function, input_list):
+    """Applies the function to all inputs in the processes of the executor and returns the results as soon as they
+    are finished. Only a limited number of inputs waits for a free process at the same time.
 
     """
 
-    file_info, config = input_file_part_tuple
+    input_iterator = iter(input_list)
+    pending_futures = set()
 
-    file_id, part_counter, new_file_path, new_file_name, duration_milli_seconds, full_audio_duration = file_info
+    while True:
+        for input_element in input_iterator:
+            pending_futures.add(executor.submit(function, input_element))
 
-    # sphinx processes
-    _global_pocket_sphinx.decode(audio_file=new_file_path, buffer_size=2048, no_search=False,
-                                 full_utt=False)
+            if len(pending_futures) >= configuration.SPEECH_RECOGNITION_MAX_PENDING_PARTS:
+                break
 
-    # returns a list of different hypothesis
-    detailed_segments = _global_pocket_sphinx.segments(detailed=True)
+        if not pending_futures:
+            return
+
+        done_futures, pending_futures = concurrent.futures.wait(pending_futures,
+                                                                return_when=concurrent.futures.FIRST_COMPLETED)
+
+        for future in done_futures:
+            yield future.result()
+
+
+# the backend and its fingerprint are created once per process of the speech recognition, not at import time
+_global_speech_backend = None
+_global_model_fingerprint = None
+
+
+def init_speech_recognition_process(backend_name, config):
+    """Loads the backend of the speech recognition in a new process of the parallel speech recognition.
+
+    """
+
+    global _global_speech_backend, _global_model_fingerprint
+
+    _global_speech_backend = create_speech_backend(backend_name, config)
+    _global_model_fingerprint = _global_speech_backend.get_fingerprint()
+
+
+def _get_speech_backend():
+    """Returns the backend of the speech recognition of the current process.
+    The backend is loaded on first use, if the process was not initialized by the speech recognition.
+
+    """
+
+    if not _global_speech_backend:
+        init_speech_recognition_process(*_get_backend_arguments())
+
+    return _global_speech_backend
+
+
+def _get_backend_arguments():
+    """Returns the name and the parameters of the configured backend of the speech recognition.
+
+    """
+
+    backend_name = configuration.SPEECH_RECOGNITION_BACKEND
+
+    return backend_name, configuration.SPEECH_RECOGNITION_BACKEND_CONFIGS[backend_name]
+
+
+def _get_cache_key(pcm_data):
+    """Returns the cache key of the decoder output of an audio segment.
+    The cache key changes if the raw audio data, the backend or its model changes.
+
+    """
+
+    _get_speech_backend()
+
+    audio_hash = hashlib.blake2b(pcm_data, digest_size=16).hexdigest()
+
+    return f"{_global_model_fingerprint}:{audio_hash}"
+
+
+def _decode_raw_data(pcm_data):
+    """Passes the raw audio data (16 bit, mono) of an audio segment to the backend in large blocks without an
+    intermediate file. Returns the hypothesis segments (word, probability, start frame, end frame).
+
+    """
+
+    return _get_speech_backend().decode(pcm_data, configuration.SPEECH_RECOGNITION_RAW_BUFFER_SIZE)
+
+
+def filter_segment_lists(segment_lists):
+    """Returns the recognized words and their timings of the hypothesis segments of the backend of many audio
+    segments. The hypothesis segments are not changed, so they can be filtered again.
+
+    """
 
     # removes all words with low confidence score (word probability)
-    removed_detailed_segments = _remove_low_probabilities(detailed_segments)
+    removed_detailed_segment_lists = _remove_low_probabilities_batch(
+        [[tuple(segment) for segment in segment_list] for segment_list in segment_lists])
 
     # replace all words which contain meta information
-    clean_token_list = _clean_token_list(removed_detailed_segments)
+    return [(_clean_token_list(removed_detailed_segments), _get_token_timing_list(removed_detailed_segments)) for
+            removed_detailed_segments in removed_detailed_segment_lists]
+
+
+def filter_segment_list(segment_list):
+    """Returns the recognized words and their timings of the hypothesis segments of the backend of one audio segment.
+
+    """
+
+    return filter_segment_lists([segment_list])[0]
+
+
+def extract_speech_from_raw_data(pcm_data, cache_entry=None):
+    """Recognizes the speech of the raw audio data of an audio segment.
+    The decoder output of a previous run is reused, if the raw audio data and the model did not change.
+    Returns the recognized words, their timings, the cache key and the new decoder output (None if it was taken from
+    the cache).
+
+    """
+
+    cache_key = _get_cache_key(pcm_data)
+
+    if cache_entry and cache_entry[0] == cache_key:
+        token_list, timing_list = filter_segment_list(cache_entry[1])
+
+        return token_list, timing_list, cache_key, None
+
+    segment_list = _decode_raw_data(pcm_data)
+
+    token_list, timing_list = filter_segment_list(segment_list)
+
+    return token_list, timing_list, cache_key, segment_list
+
+
+def extract_speech_from_file_parallel(input_file_part_tuple):
+    """Recognizes the speech of an audio segment.
+    The raw audio data is read from the data chunk of the wav file or from the memory map of the container.
+
+    """
+
+    file_id, part_counter, new_file_path, new_file_name, duration_milli_seconds, full_audio_duration, \
+        cache_entry = input_file_part_tuple
+
+    pcm_data = AudioProcessing().read_part_data(file_id, [part_counter, new_file_path])
+
+    clean_token_list, timing_list, cache_key, segment_list = extract_speech_from_raw_data(pcm_data, cache_entry)
 
     return_tuple = (
         file_id, part_counter, new_file_path, new_file_name, duration_milli_seconds, full_audio_duration,
-        clean_token_list)
+        clean_token_list, timing_list, cache_key, segment_list)
     return return_tuple
 
 
-def _remove_low_probabilities(speech_token_list):
-    """Removes all non relevant words with low confidence scores (word probabilities) of the recognized speech.
+def convert_and_extract_speech_parallel(input_file_tuple):
+    """Converts one audio file and recognizes the speech of its audio segments in the same process.
+    The audio segments are read from the page cache directly after the conversion.
+
+    """
+
+    audio_input_file_tuple, recognized_part_set, part_cache_dictionary = input_file_tuple
+
+    file_id, file_part_list, checksum_list = convert_audio_file_parallel(audio_input_file_tuple)
+
+    token_part_list = []
+
+    if file_part_list is not None:
+        audio_processing = AudioProcessing()
+
+        for file_part in file_part_list:
+            if file_part[0] in recognized_part_set:
+                continue
+
+            pcm_data = audio_processing.read_part_data(file_id, file_part)
+
+            clean_token_list, timing_list, cache_key, segment_list = extract_speech_from_raw_data(
+                pcm_data, part_cache_dictionary.get(file_part[0]))
+
+            token_part_list.append([file_part[0], clean_token_list, timing_list, cache_key, segment_list])
+
+    return file_id, file_part_list, checksum_list, token_part_list
+
+
+def _get_low_probability_mask(probability_array, length_array):
+    """Returns a mask of all removed words of the concatenated hypothesis segments of many audio segments.
+    A checked word with a probability below the first threshold is removed together with the neighbouring runs of
+    words with probabilities below the second threshold. Every run is found with one binary search, so the mask is
+    calculated in linear time.
 
     """
 
-    speech_token_list_len = len(speech_token_list)
+    word_number = len(probability_array)
 
-    for index in range(speech_token_list_len - 1):
+    end_array = numpy.cumsum(length_array)
+    begin_array = end_array - length_array
 
-        index += 1
+    segment_array = numpy.repeat(numpy.arange(len(length_array)), length_array)
+    position_array = numpy.arange(word_number) - begin_array[segment_array]
+    segment_length_array = length_array[segment_array]
 
-        if index > speech_token_list_len - 2:
-            index = speech_token_list_len - 2
+    # the first and the last word are not checked, except in audio segments of two words (only the first word)
+    checked_mask = ((position_array >= 1) & (position_array <= segment_length_array - 2)) | \
+                   ((segment_length_array == 2) & (position_array == 0))
 
-        next_word, next_probability, next_score, next_confidence = speech_token_list[index + 1]
-        word, probability, score, confidence = speech_token_list[index]
-        previous_word, previous_probability, previous_score, previous_confidence = speech_token_list[index - 1]
+    first_mask = probability_array < configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD
+    second_mask = probability_array < configuration.SPEECH_RECOGNITION_SECOND_PROBABILITY_THRESHOLD
 
-        if probability < configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD:
-            speech_token_list[index] = (
-                configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score, confidence)
+    removed_mask = checked_mask & first_mask
+    removed_index_array = numpy.flatnonzero(removed_mask)
 
-            if next_probability >= configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD:
+    # the runs of words below the second threshold end at words above the second threshold
+    stop_index_array = numpy.concatenate(([-1], numpy.flatnonzero(~second_mask), [word_number]))
 
-                start = index + 1
+    # forward runs start at the next word, if it is above the first threshold
+    forward_index_array = removed_index_array[position_array[removed_index_array] + 1 <
+                                              segment_length_array[removed_index_array]] + 1
+    forward_index_array = forward_index_array[~first_mask[forward_index_array]]
 
-                while start < speech_token_list_len:
-                    word, probability, score, confidence = speech_token_list[start]
+    forward_end_array = numpy.minimum(
+        stop_index_array[numpy.searchsorted(stop_index_array, forward_index_array)],
+        end_array[segment_array[forward_index_array]])
 
-                    if probability < configuration.SPEECH_RECOGNITION_SECOND_PROBABILITY_THRESHOLD:
-                        speech_token_list[start] = (
-                            configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score,
-                            confidence)
-                        start += 1
-                    else:
-                        start = speech_token_list_len
+    # backward runs start at the previous word, if it is above the first threshold
+    backward_index_array = removed_index_array[position_array[removed_index_array] >= 1] - 1
+    backward_index_array = backward_index_array[~first_mask[backward_index_array]]
 
-            if previous_probability >= configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD:
+    backward_begin_array = numpy.maximum(
+        stop_index_array[numpy.searchsorted(stop_index_array, backward_index_array, side='right') - 1] + 1,
+        begin_array[segment_array[backward_index_array]])
 
-                start = index - 1
+    # marks all runs at the same time with a cumulative sum over their borders
+    border_array = numpy.zeros(word_number + 1, dtype=numpy.int64)
 
-                while start >= 0:
-                    word, probability, score, confidence = speech_token_list[start]
+    numpy.add.at(border_array, forward_index_array, 1)
+    numpy.add.at(border_array, forward_end_array, -1)
+    numpy.add.at(border_array, backward_begin_array, 1)
+    numpy.add.at(border_array, backward_index_array + 1, -1)
 
-                    if probability < configuration.SPEECH_RECOGNITION_SECOND_PROBABILITY_THRESHOLD:
-                        speech_token_list[start] = (
-                            configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score,
-                            confidence)
-                        start -= 1
-                    else:
-                        start = -1
+    return removed_mask | (numpy.cumsum(border_array[:-1]) > 0)
 
-    return speech_token_list
+
+def _remove_low_probabilities_batch(speech_token_lists):
+    """Removes all non relevant words with low confidence scores (word probabilities) of the recognized speech of
+    many audio segments at the same time. The lists of words are changed in place.
+
+    """
+
+    length_array = numpy.fromiter((len(speech_token_list) for speech_token_list in speech_token_lists),
+                                  dtype=numpy.int64, count=len(speech_token_lists))
+
+    probability_array = numpy.fromiter(
+        (speech_token[1] for speech_token_list in speech_token_lists for speech_token in speech_token_list),
+        dtype=numpy.float64, count=int(length_array.sum()))
+
+    removed_index_array = numpy.flatnonzero(_get_low_probability_mask(probability_array, length_array))
+
+    # maps the indexes of the concatenated words back to the lists of words
+    end_array = numpy.cumsum(length_array)
+    segment_index_array = numpy.searchsorted(end_array, removed_index_array, side='right')
+    position_array = removed_index_array - (end_array - length_array)[segment_index_array]
+
+    for segment_index, position in zip(segment_index_array.tolist(), position_array.tolist(), strict=True):
+        speech_token_list = speech_token_lists[segment_index]
+
+        word, probability, score, confidence = speech_token_list[position]
+        speech_token_list[position] = (
+            configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score, confidence)
+
+    return speech_token_lists
+
+
+def _remove_low_probabilities(speech_token_list):
+    """Removes all non relevant words with low confidence scores (word probabilities) of the recognized speech.
+
+    """
+
+    return _remove_low_probabilities_batch([speech_token_list])[0]
 
 
 def _clean_token_list(speech_token_list):
@@ -272,3 +710,20 @@ def _clean_token_list(speech_token_list):
             token_list.append(token)
 
     return token_list
+
+
+def _get_token_timing_list(speech_token_list):
+    """Returns the start frame and the end frame of every word of the cleaned speech as one flat list.
+    The timings are aligned with the words of _clean_token_list, removed meta information has no timing.
+
+    """
+
+    timing_list = []
+
+    for token, _probability, start_frame, end_frame in speech_token_list:
+
+        # meta information without replacement is removed from the recognized speech
+        if configuration.SPEECH_RECOGNITION_WRONG_TERMS_DICT.get(token.lower(), True):
+            timing_list.extend((start_frame, end_frame))
+
+    return timing_list
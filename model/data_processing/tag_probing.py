@@ -0,0 +1,382 @@
+import collections
+import logging
+import os
+import threading
+
+import tinytag
+from campus_wave import configuration
+
+# immutable result of the ID3 Tag and the audio stream probing of one audio file
+ProbeRecord = collections.namedtuple('ProbeRecord', ['file_path', 'is_readable', 'title', 'album_artist', 'track',
+                                                     'duration', 'sample_rate', 'channels', 'is_exact_duration'],
+                                     defaults=(None, None, None, None))
+
+# reusable read buffers of the threads which read the ID3 Tags
+_thread_data = threading.local()
+
+_logger = logging.getLogger(__name__)
+
+
+class TagProbing:
+    """This class reads the ID3 Tags of audio files.
+    Only the tag region at the beginning and the end of MP3 files is read, all other audio files are read by tinytag.
+    The duration, the sampling frequency and the number of channels are read from the first MPEG frame header or
+    the wav file header, so the audio files are not decoded.
+    The class has no state, so multiple threads can probe audio files at the same time.
+
+    """
+
+    # text encodings of the ID3v2 text frames
+    TEXT_ENCODINGS = {0: 'latin-1', 1: 'utf-16', 2: 'utf-16-be', 3: 'utf-8'}
+
+    # ID3v2.2 and ID3v2.3/2.4 frame names of the title, the album artist and the track
+    FRAME_FIELDS = {'TT2': 'title', 'TP2': 'album_artist', 'TRK': 'track',
+                    'TIT2': 'title', 'TPE2': 'album_artist', 'TRCK': 'track'}
+
+    # number of bytes after the ID3v2 tag region which are searched for the first MPEG frame header
+    FRAME_SEARCH_BYTES = 64 * 1024
+
+    # MPEG bit rates (kbit/s) of MPEG 1 and MPEG 2/2.5 per layer
+    MPEG_BIT_RATES = {(1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+                      (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+                      (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+                      (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+                      (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+                      (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)}
+
+    # MPEG sampling frequencies of the version bits of the frame header (0: MPEG 2.5, 2: MPEG 2, 3: MPEG 1)
+    MPEG_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+    @staticmethod
+    def _get_read_buffer(byte_number):
+        """Returns a reusable read buffer of the current thread with at least the given size.
+
+        """
+
+        if len(getattr(_thread_data, 'read_buffer', b'')) < byte_number:
+            _thread_data.read_buffer = bytearray(byte_number)
+
+        return memoryview(_thread_data.read_buffer)[:byte_number]
+
+    @staticmethod
+    def _get_syncsafe_integer(byte_list):
+        """Converts a syncsafe integer (7 bits per byte) of the ID3v2 header.
+
+        """
+
+        return (byte_list[0] << 21) | (byte_list[1] << 14) | (byte_list[2] << 7) | byte_list[3]
+
+    def _decode_text_frame(self, frame_data):
+        """Returns the text of an ID3v2 text frame.
+
+        """
+
+        if not frame_data:
+            return ''
+
+        encoding = self.TEXT_ENCODINGS.get(frame_data[0], 'latin-1')
+
+        try:
+            text = bytes(frame_data[1:]).decode(encoding)
+        except UnicodeDecodeError:
+            return ''
+
+        return text.strip('\x00').strip()
+
+    def _parse_id3v2_frames(self, tag_data, major_version):
+        """Returns the title, the album artist and the track of the ID3v2 tag region.
+
+        """
+
+        field_dictionary = {}
+
+        header_size = 6 if major_version == 2 else 10
+        name_size = 3 if major_version == 2 else 4
+        offset = 0
+
+        while offset + header_size <= len(tag_data):
+            frame_name = bytes(tag_data[offset:offset + name_size])
+
+            # the padding at the end of the tag region
+            if not frame_name.strip(b'\x00'):
+                break
+
+            if major_version == 2:
+                frame_size = int.from_bytes(tag_data[offset + 3:offset + 6], 'big')
+            elif major_version == 4:
+                frame_size = self._get_syncsafe_integer(tag_data[offset + 4:offset + 8])
+            else:
+                frame_size = int.from_bytes(tag_data[offset + 4:offset + 8], 'big')
+
+            offset += header_size
+
+            field_name = self.FRAME_FIELDS.get(frame_name.decode('latin-1'))
+
+            if field_name and field_name not in field_dictionary:
+                field_dictionary[field_name] = self._decode_text_frame(tag_data[offset:offset + frame_size])
+
+            offset += frame_size
+
+        return field_dictionary
+
+    @staticmethod
+    def _parse_id3v1(tag_data):
+        """Returns the title and the track of the ID3v1 tag at the end of the audio file.
+
+        """
+
+        field_dictionary = {}
+
+        if bytes(tag_data[:3]) != b'TAG':
+            return field_dictionary
+
+        field_dictionary['title'] = bytes(tag_data[3:33]).decode('latin-1').strip('\x00').strip()
+
+        # ID3v1.1 stores the track in the last byte of the comment
+        if tag_data[125] == 0 and tag_data[126]:
+            field_dictionary['track'] = str(tag_data[126])
+
+        return field_dictionary
+
+    def _parse_mpeg_header(self, header_data):
+        """Returns the attributes of a MPEG audio frame header or None if the bytes are no valid frame header.
+
+        """
+
+        frame_header = int.from_bytes(header_data[:4], 'big')
+
+        version_bits = (frame_header >> 19) & 0x3
+        layer = 4 - ((frame_header >> 17) & 0x3)
+        bit_rate_index = (frame_header >> 12) & 0xF
+        sample_rate_index = (frame_header >> 10) & 0x3
+
+        if (frame_header >> 21) != 0x7FF or version_bits == 1 or layer == 4 or bit_rate_index in (0, 15) or \
+                sample_rate_index == 3:
+            return None
+
+        mpeg_version = 1 if version_bits == 3 else 2
+
+        bit_rate = self.MPEG_BIT_RATES[(mpeg_version, layer)][bit_rate_index] * 1000
+        sample_rate = self.MPEG_SAMPLE_RATES[version_bits][sample_rate_index]
+        padding = (frame_header >> 9) & 0x1
+        channels = 1 if (frame_header >> 6) & 0x3 == 3 else 2
+
+        if layer == 1:
+            frame_samples = 384
+            frame_size = (12 * bit_rate // sample_rate + padding) * 4
+        elif layer == 3 and mpeg_version == 2:
+            frame_samples = 576
+            frame_size = 72 * bit_rate // sample_rate + padding
+        else:
+            frame_samples = 1152
+            frame_size = 144 * bit_rate // sample_rate + padding
+
+        return {'mpeg_version': mpeg_version, 'layer': layer, 'bit_rate': bit_rate, 'sample_rate': sample_rate,
+                'channels': channels, 'frame_samples': frame_samples, 'frame_size': frame_size}
+
+    def _probe_mpeg_stream(self, file, audio_offset, audio_size):
+        """Returns the duration, the sampling frequency and the number of channels of the MPEG audio stream.
+        The duration is read from the Xing or VBRI header, otherwise it is estimated from the constant bit rate.
+        MP3 files with variable bit rate and without Xing or VBRI header only have a rough estimate.
+
+        """
+
+        file.seek(audio_offset)
+        read_buffer = self._get_read_buffer(self.FRAME_SEARCH_BYTES)
+        search_data = bytes(read_buffer[:file.readinto(read_buffer)])
+
+        offset = search_data.find(b'\xff')
+
+        while -1 < offset <= len(search_data) - 4:
+            frame_info = self._parse_mpeg_header(search_data[offset:offset + 4])
+
+            # a frame header is only accepted if the next frame header follows directly
+            if frame_info:
+                next_offset = offset + frame_info['frame_size']
+
+                if next_offset + 4 > len(search_data) or self._parse_mpeg_header(
+                        search_data[next_offset:next_offset + 4]):
+                    break
+
+            offset = search_data.find(b'\xff', offset + 1)
+        else:
+            return {}
+
+        # the Xing header follows the side information of the first MPEG Layer III frame
+        if frame_info['mpeg_version'] == 1:
+            side_size = 17 if frame_info['channels'] == 1 else 32
+        else:
+            side_size = 9 if frame_info['channels'] == 1 else 17
+
+        xing_offset = offset + 4 + side_size
+        vbri_offset = offset + 36
+
+        frame_number = None
+
+        if search_data[xing_offset:xing_offset + 4] in (b'Xing', b'Info') and \
+                int.from_bytes(search_data[xing_offset + 4:xing_offset + 8], 'big') & 0x1:
+            frame_number = int.from_bytes(search_data[xing_offset + 8:xing_offset + 12], 'big')
+        elif search_data[vbri_offset:vbri_offset + 4] == b'VBRI':
+            frame_number = int.from_bytes(search_data[vbri_offset + 14:vbri_offset + 18], 'big')
+
+        if frame_number:
+            duration = frame_number * frame_info['frame_samples'] * 1000 // frame_info['sample_rate']
+        else:
+            duration = (audio_size - audio_offset - offset) * 8 * 1000 // frame_info['bit_rate']
+
+        return {'duration': duration, 'sample_rate': frame_info['sample_rate'], 'channels': frame_info['channels'],
+                'is_exact_duration': bool(frame_number)}
+
+    def _probe_wav_file(self, file_path):
+        """Returns the duration, the sampling frequency and the number of channels of the wav file header.
+
+        """
+
+        with open(file_path, 'rb', buffering=0) as file:
+            file_size = os.fstat(file.fileno()).st_size
+
+            header = self._get_read_buffer(12)
+
+            if file.readinto(header) != 12 or bytes(header[:4]) != b'RIFF' or bytes(header[8:12]) != b'WAVE':
+                return {}
+
+            stream_dictionary = {}
+            byte_rate = 0
+
+            chunk_header = self._get_read_buffer(24)
+
+            # the chunks are skipped until the data chunk, only the fmt chunk is read
+            while file.readinto(chunk_header[:8]) == 8:
+                chunk_name = bytes(chunk_header[:4])
+                chunk_size = int.from_bytes(chunk_header[4:8], 'little')
+
+                if chunk_name == b'fmt ' and chunk_size >= 16:
+                    file.readinto(chunk_header[8:24])
+
+                    stream_dictionary['channels'] = int.from_bytes(chunk_header[10:12], 'little')
+                    stream_dictionary['sample_rate'] = int.from_bytes(chunk_header[12:16], 'little')
+                    byte_rate = int.from_bytes(chunk_header[16:20], 'little')
+
+                    file.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+                elif chunk_name == b'data':
+                    # streamed wav files often contain a wrong size of the data chunk
+                    data_size = min(chunk_size, file_size - file.tell())
+
+                    if byte_rate:
+                        stream_dictionary['duration'] = data_size * 1000 // byte_rate
+                        stream_dictionary['is_exact_duration'] = True
+
+                    break
+                else:
+                    file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+        return stream_dictionary
+
+    def _probe_mp3_file(self, file_path):
+        """Reads the ID3v2 tag region and the ID3v1 tag and the first MPEG frame header of a MP3 file.
+        The ID3 Tags are None if the tag region can not be read without tinytag.
+
+        """
+
+        field_dictionary = {}
+        audio_offset = 0
+
+        with open(file_path, 'rb', buffering=0) as file:
+            file_size = os.fstat(file.fileno()).st_size
+
+            header = self._get_read_buffer(10)
+            byte_number = file.readinto(header)
+
+            if byte_number == 10 and bytes(header[:3]) == b'ID3':
+                major_version = header[3]
+                tag_flags = header[5]
+                tag_size = self._get_syncsafe_integer(header[6:10])
+
+                # the audio stream starts after the tag region and the optional footer
+                audio_offset = 10 + tag_size + (10 if tag_flags & 0x10 else 0)
+
+                # unsynchronised, unknown or very large tag regions are read by tinytag
+                if (tag_flags & 0x80) or major_version not in (2, 3, 4) or \
+                        tag_size > configuration.DATA_FILTERING_TAG_HEADER_BYTES:
+                    return None, self._probe_mpeg_stream(file, audio_offset, file_size)
+
+                tag_data = self._get_read_buffer(tag_size)
+                tag_data = tag_data[:file.readinto(tag_data)]
+
+                # skips the extended header
+                if tag_flags & 0x40 and major_version == 3:
+                    tag_data = tag_data[4 + int.from_bytes(tag_data[:4], 'big'):]
+                elif tag_flags & 0x40 and major_version == 4:
+                    tag_data = tag_data[self._get_syncsafe_integer(tag_data[:4]):]
+
+                field_dictionary = self._parse_id3v2_frames(tag_data, major_version)
+
+            audio_size = file_size
+
+            if file_size >= 128:
+                file.seek(file_size - 128)
+                tag_data = self._get_read_buffer(128)
+                tag_data = tag_data[:file.readinto(tag_data)]
+
+                if bytes(tag_data[:3]) == b'TAG':
+                    audio_size -= 128
+
+                # the ID3v1 tag only completes missing fields of the ID3v2 tag
+                for field_name, field_value in self._parse_id3v1(tag_data).items():
+                    if not field_dictionary.get(field_name):
+                        field_dictionary[field_name] = field_value
+
+            stream_dictionary = self._probe_mpeg_stream(file, audio_offset, audio_size)
+
+        return field_dictionary, stream_dictionary
+
+    def probe_file(self, file_path):
+        """Returns the ID3 Tags of the audio file as immutable record.
+        Unreadable audio files and MP3 files without MPEG frames are marked in the record.
+
+        """
+
+        try:
+            field_dictionary = None
+            stream_dictionary = {}
+
+            if file_path.lower().endswith('mp3'):
+                field_dictionary, stream_dictionary = self._probe_mp3_file(file_path)
+
+                # the first MPEG frame header can follow a long padding, tinytag reads the whole audio stream then
+                if not stream_dictionary:
+                    _logger.info("No MPEG frame header in the first %d KB of the audio stream of %s, the audio "
+                                 "stream is read by tinytag", self.FRAME_SEARCH_BYTES // 1024, file_path)
+
+                    tiny_tag = tinytag.TinyTag.get(file_path)
+
+                    # MP3 files without any valid MPEG frame header are corrupt
+                    if not tiny_tag.duration:
+                        return ProbeRecord(file_path, False, None, None, None)
+
+                    stream_dictionary = {'duration': round(tiny_tag.duration * 1000),
+                                         'sample_rate': tiny_tag.samplerate, 'channels': tiny_tag.channels,
+                                         'is_exact_duration': False}
+            elif file_path.lower().endswith('wav'):
+                stream_dictionary = self._probe_wav_file(file_path)
+
+            if field_dictionary is None:
+                tiny_tag = tinytag.TinyTag.get(file_path, duration=False)
+                field_dictionary = {'title': tiny_tag.title, 'album_artist': tiny_tag.albumartist,
+                                    'track': tiny_tag.track}
+        except Exception:
+            # tinytag raises different exceptions for damaged audio files
+            return ProbeRecord(file_path, False, None, None, None)
+
+        return ProbeRecord(file_path, True, field_dictionary.get('title') or None,
+                           field_dictionary.get('album_artist') or None, field_dictionary.get('track') or None,
+                           stream_dictionary.get('duration'), stream_dictionary.get('sample_rate'),
+                           stream_dictionary.get('channels'), stream_dictionary.get('is_exact_duration', False))
+
+    def probe_batch(self, file_path_list, executor):
+        """Returns the ID3 Tags of a list of audio files.
+        The audio files are read in parallel by the given worker pool.
+
+        """
+
+        return list(executor.map(self.probe_file, file_path_list))
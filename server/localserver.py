@@ -2,13 +2,27 @@ import contextlib
 import datetime
 import uuid
 
-from campus_wave import configuration
 import flask
+import werkzeug.routing
+from campus_wave import configuration
 from controller import model_controller
+from model.data_processing.part_store import PartStore
+
+
+class FileIdConverter(werkzeug.routing.BaseConverter):
+    """This class only accepts file ids (hexadecimal hash values) as part of a web address.
+    Other values like '..' or backslashes could refer to files outside of the storage folder.
+
+    """
+
+    regex = PartStore.FILE_ID_PATTERN.pattern
+
 
 # starts a new web server
 app = flask.Flask(__name__)
 
+app.url_map.converters['file_id'] = FileIdConverter
+
 # initializes the secret key for the encryption of the session
 app.secret_key = configuration.FLASK_SECRET_KEY
 
@@ -85,6 +99,48 @@ def search_page():
         flask.abort(404)
 
 
+@app.route('/audio/<file_id:file_id>/<int:file_part>', methods=['GET'])
+def audio_part_page(file_id, file_part):
+    """Streams an audio segment of a container as wav file, byte ranges are supported.
+    Adress: http://127.0.0.1:5000/audio/<file_id>/<file_part>
+
+    """
+
+    wave_size = model_controller.get_audio_part_size(file_id, file_part)
+
+    if wave_size is None:
+        flask.abort(404)
+
+    # HTTP range request of the audio player
+    byte_range = flask.request.range
+
+    if byte_range:
+        range_tuple = byte_range.range_for_length(wave_size)
+
+        if not range_tuple:
+            flask.abort(416)
+
+        start, stop = range_tuple
+    else:
+        start, stop = 0, wave_size
+
+    wave_data = model_controller.get_audio_part_range(file_id, file_part, start, stop)
+
+    # the container was removed after the size request
+    if wave_data is None:
+        flask.abort(404)
+
+    if byte_range:
+        response = flask.Response(wave_data, status=206, mimetype='audio/wav')
+        response.headers['Content-Range'] = f"bytes {start}-{stop - 1}/{wave_size}"
+    else:
+        response = flask.Response(wave_data, mimetype='audio/wav')
+
+    response.headers['Accept-Ranges'] = 'bytes'
+
+    return response
+
+
 @app.route('/help', methods=['GET'])
 def help_page():
     """The help page of the web application.
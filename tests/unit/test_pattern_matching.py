@@ -0,0 +1,20 @@
+from model.data_processing.pattern_matching import PatternMatching
+
+
+def test_has_match_finds_patterns_with_common_prefix() -> None:
+    matcher = PatternMatching(["beitrag", "beiträge", "sendung"])
+    assert matcher.has_match("2015_beiträge_final.mp3")
+    assert matcher.has_match("mein_beitrag.mp3")
+    assert matcher.has_match("die sendung")
+    assert not matcher.has_match("beitr_sendun.mp3")
+
+
+def test_has_match_escapes_special_characters() -> None:
+    matcher = PatternMatching([r"\musik\a", "o-ton", "sdp "])
+    assert matcher.has_match(r"d:\musik\archiv\x.mp3")
+    assert matcher.has_match("o-ton_interview.wav")
+    assert not matcher.has_match("sdp.mp3")
+
+
+def test_has_match_with_empty_pattern_list_never_matches() -> None:
+    assert not PatternMatching([]).has_match("beitrag")
@@ -0,0 +1,56 @@
+import math
+import struct
+
+import numpy
+import pydub
+from model.data_processing.sample_buffer import SampleBuffer
+
+
+def _build_audio_segment(duration_milliseconds: int) -> pydub.AudioSegment:
+    frame_list = [struct.pack("<h", int(1500 * math.sin(index * 0.07))) for index in range(16 * duration_milliseconds)]
+    return pydub.AudioSegment(data=b"".join(frame_list), sample_width=2, frame_rate=16000, channels=1)
+
+
+def test_normalize_matches_pydub_apply_gain() -> None:
+    audio_segment = _build_audio_segment(3000)
+    sample_buffer = SampleBuffer.from_audio_segment(audio_segment)
+
+    sample_buffer.normalize(-20)
+    expected_segment = audio_segment.apply_gain(abs(audio_segment.dBFS) - 20)
+
+    assert sample_buffer.get_samples().tobytes() == expected_segment.raw_data
+
+
+def test_split_parts_share_memory_and_overlap() -> None:
+    sample_buffer = SampleBuffer.from_audio_segment(_build_audio_segment(2500))
+
+    part_list = list(sample_buffer.split_parts(1000, 200))
+
+    assert [part.get_duration() for part in part_list] == [1200, 1200, 500]
+    assert [part.get_start() for part in part_list] == [0, 1000, 2000]
+    assert all(part.get_samples().base is sample_buffer.get_samples() for part in part_list)
+
+
+def test_get_speech_regions_skips_silence_and_noise() -> None:
+    random_generator = numpy.random.default_rng(7)
+    time_line = numpy.arange(16000) / 16000
+
+    tone = (3000 * numpy.sin(2 * numpy.pi * 220 * time_line)).astype(numpy.int16)
+    noise = random_generator.integers(-3000, 3000, 16000).astype(numpy.int16)
+    silence = numpy.zeros(16000, dtype=numpy.int16)
+
+    samples = numpy.concatenate((silence, silence, tone, tone, silence, silence, noise, silence, silence, tone))
+    sample_buffer = SampleBuffer(samples, 16000, 1)
+
+    speech_region_list = sample_buffer.get_speech_regions(30, -45, 0.35, 1000, 500, 0)
+
+    assert speech_region_list == [(1980, 4020), (9000, 9990)]
+
+
+def test_split_speech_parts_keep_position_in_audio_file() -> None:
+    sample_buffer = SampleBuffer(numpy.zeros(16000 * 10, dtype=numpy.int16), 16000, 1)
+
+    part_list = list(sample_buffer.split_speech_parts(2000, 500, [(1000, 4000), (7000, 8000)]))
+
+    assert [(part.get_start(), part.get_duration()) for part in part_list] == [
+        (1000, 2500), (3000, 1000), (7000, 1000)]
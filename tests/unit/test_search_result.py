@@ -0,0 +1,26 @@
+from model.data_interface.search_result import SearchResult
+from model.data_processing.speech_recognition import filter_segment_list
+
+
+def test_playback_fragment_starts_at_first_found_search_term() -> None:
+    # the start of sentence tag is replaced and the silence is removed from the recognized speech
+    segment_list = [["<s>", 0, 0, 9], ["hello", 0, 10, 140], ["<sil>", 0, 141, 260], ["world", 0, 261, 395],
+                    ["</s>", 0, 396, 399]]
+
+    token_list, timing_list = filter_segment_list(segment_list)
+
+    assert SearchResult._get_playback_fragment(timing_list, token_list, {"world"}) == "#t=2"
+    assert SearchResult._get_playback_fragment(timing_list, token_list, {"hello", "world"}) == "#t=0"
+
+
+def test_playback_fragment_without_timings_starts_at_beginning() -> None:
+    token_list = [".", "hello", "world", "."]
+
+    # documents of older retrieval systems contain no word timings
+    assert SearchResult._get_playback_fragment(None, token_list, {"world"}) == ""
+    assert SearchResult._get_playback_fragment([], token_list, {"world"}) == ""
+
+    # incomplete word timings
+    assert SearchResult._get_playback_fragment([0, 9, 10, 140], token_list, {"world"}) == ""
+
+    assert SearchResult._get_playback_fragment([0, 9, 10, 140, 261, 395], token_list, {"unknown"}) == ""
@@ -0,0 +1,146 @@
+import random
+from pathlib import Path
+
+import pytest
+from campus_wave import configuration
+from model.data_processing.speech_recognition import (
+    SpeechRecognition,
+    _remove_low_probabilities,
+    _remove_low_probabilities_batch,
+    filter_segment_list,
+)
+
+
+def _remove_low_probabilities_reference(speech_token_list: list) -> list:
+    # copy of the former loop implementation
+    speech_token_list_len = len(speech_token_list)
+
+    for index in range(speech_token_list_len - 1):
+        index += 1
+
+        if index > speech_token_list_len - 2:
+            index = speech_token_list_len - 2
+
+        next_word, next_probability, next_score, next_confidence = speech_token_list[index + 1]
+        word, probability, score, confidence = speech_token_list[index]
+        previous_word, previous_probability, previous_score, previous_confidence = speech_token_list[index - 1]
+
+        if probability < configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD:
+            speech_token_list[index] = (
+                configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score, confidence)
+
+            if next_probability >= configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD:
+                start = index + 1
+
+                while start < speech_token_list_len:
+                    word, probability, score, confidence = speech_token_list[start]
+
+                    if probability < configuration.SPEECH_RECOGNITION_SECOND_PROBABILITY_THRESHOLD:
+                        speech_token_list[start] = (
+                            configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score, confidence)
+                        start += 1
+                    else:
+                        start = speech_token_list_len
+
+            if previous_probability >= configuration.SPEECH_RECOGNITION_FIRST_PROBABILITY_THRESHOLD:
+                start = index - 1
+
+                while start >= 0:
+                    word, probability, score, confidence = speech_token_list[start]
+
+                    if probability < configuration.SPEECH_RECOGNITION_SECOND_PROBABILITY_THRESHOLD:
+                        speech_token_list[start] = (
+                            configuration.SPEECH_RECOGNITION_UNKNOWN_SPEECH_TERM, probability, score, confidence)
+                        start -= 1
+                    else:
+                        start = -1
+
+    return speech_token_list
+
+
+def _build_token_lists(list_number: int) -> list:
+    # probabilities below both thresholds, between the thresholds and above both thresholds
+    probability_list = [-30000, -20000, -17000, -14000, -5000, 0]
+    random_generator = random.Random(7)
+
+    return [[(f"w{index}", random_generator.choice(probability_list), index, index + 1) for index in
+             range(random_generator.randint(0, 12))] for _list_index in range(list_number)]
+
+
+def test_remove_low_probabilities_matches_loop() -> None:
+    for token_list in _build_token_lists(2000):
+        expected_list = _remove_low_probabilities_reference(list(token_list))
+        result_list = list(token_list)
+
+        assert _remove_low_probabilities(result_list) is result_list
+        assert result_list == expected_list
+
+
+def test_remove_low_probabilities_batch_matches_loop() -> None:
+    token_lists = _build_token_lists(2000)
+
+    expected_lists = [_remove_low_probabilities_reference(list(token_list)) for token_list in token_lists]
+
+    assert _remove_low_probabilities_batch([list(token_list) for token_list in token_lists]) == expected_lists
+
+
+def test_filter_segment_list_keeps_timings_of_words() -> None:
+    segment_list = [["<s>", 0, 0, 9], ["hello", 0, 10, 42], ["<sil>", 0, 43, 60], ["world", 0, 61, 95],
+                    ["</s>", 0, 96, 99]]
+
+    token_list, timing_list = filter_segment_list(segment_list)
+
+    assert token_list == [".", "hello", "world", "."]
+    assert timing_list == [0, 9, 10, 42, 61, 95, 96, 99]
+
+
+def test_reapply_segment_cache_returns_changed_files() -> None:
+    segment_list = [["<s>", 0, 0, 9], ["hello", 0, 10, 42], ["</s>", 0, 96, 99]]
+    token_list, timing_list = filter_segment_list(segment_list)
+
+    speech_db = SpeechRecognition()
+    speech_db._speech_dictionary = {"a": [[0, token_list, timing_list]], "b": [[0, ["old"]]], "c": [[0, ["kept"]]]}
+    speech_db._segment_cache = {"a": {0: ["key", segment_list]}, "b": {0: ["key", segment_list]}}
+
+    assert speech_db.reapply_segment_cache() == ["b"]
+    assert speech_db._speech_dictionary["b"] == [[0, token_list, timing_list]]
+    assert speech_db._speech_dictionary["c"] == [[0, ["kept"]]]
+
+
+def test_reduce_audio_database_queues_missing_parts_of_partly_recognized_file() -> None:
+    speech_db = SpeechRecognition()
+    speech_db._speech_dictionary = {"f1": [[0, ["hello"], [0, 9]]]}
+    speech_db._segment_cache = {}
+    speech_db._added_file_counter = 0
+
+    audio_database = {"f1": [[0, "f1_0.wav", "f1_0.wav", 60000, 70000, 0],
+                             [1, "f1_1.wav", "f1_1.wav", 10000, 70000, 60000]]}
+
+    reduced_file_part_list = speech_db._reduce_audio_database_parallel(audio_database)
+
+    assert [(file_id, part_counter) for file_id, part_counter, *_rest in reduced_file_part_list] == [("f1", 1)]
+
+
+def test_load_database_replays_partial_log_and_queues_missing_part(tmp_path: Path,
+                                                                   monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(configuration, "SPEECH_RECOGNITION_JSON_STORAGE_FILE", str(tmp_path / "speech.json"))
+    monkeypatch.setattr(configuration, "SPEECH_RECOGNITION_LOG_FILE", str(tmp_path / "speech_log.json"))
+    monkeypatch.setattr(configuration, "SPEECH_RECOGNITION_SEGMENT_CACHE_FILE", str(tmp_path / "segments.json"))
+
+    # the recognition process was killed after the first audio segment of the file
+    (tmp_path / "speech_log.json").write_text('["f1", 0, ["hello"], [0, 9]]\n["f1", 1, ["wor', encoding="utf8")
+
+    speech_db = SpeechRecognition()
+    speech_db._speech_dictionary = {}
+    speech_db._segment_cache = {}
+    speech_db._added_file_counter = 0
+    speech_db.load_database()
+
+    assert speech_db._speech_dictionary == {"f1": [[0, ["hello"], [0, 9]]]}
+
+    audio_database = {"f1": [[0, "f1_0.wav", "f1_0.wav", 60000, 70000, 0],
+                             [1, "f1_1.wav", "f1_1.wav", 10000, 70000, 60000]]}
+
+    reduced_file_part_list = speech_db._reduce_audio_database_parallel(audio_database)
+
+    assert [(file_id, part_counter) for file_id, part_counter, *_rest in reduced_file_part_list] == [("f1", 1)]
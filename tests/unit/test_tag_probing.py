@@ -0,0 +1,84 @@
+import struct
+from pathlib import Path
+
+from model.data_processing.tag_probing import TagProbing
+
+
+def test_probe_wav_file_skips_chunks_before_data(tmp_path: Path) -> None:
+    list_chunk = b"LIST" + struct.pack("<I", 5) + b"INFOx\0"
+    fmt_chunk = b"fmt " + struct.pack("<IHHIIHH", 16, 1, 2, 16000, 64000, 4, 16)
+    data_chunk = b"data" + struct.pack("<I", 64000 * 3) + bytes(64000 * 3)
+
+    file_path = tmp_path / "speech.wav"
+    file_path.write_bytes(b"RIFF" + struct.pack("<I", 0) + b"WAVE" + list_chunk + fmt_chunk + data_chunk)
+
+    probe_record = TagProbing().probe_file(str(file_path))
+
+    assert (probe_record.duration, probe_record.sample_rate, probe_record.channels) == (3000, 16000, 2)
+    assert probe_record.is_exact_duration
+
+
+def test_probe_mp3_file_estimates_constant_bit_rate_duration(tmp_path: Path) -> None:
+    # MPEG 1 Layer III, 128 kbit/s, 44.1 kHz, mono, frames of 417 bytes
+    frame_data = bytes.fromhex("fffb90c0") + bytes(413)
+
+    id3_tag = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 16]) + b"TIT2" + struct.pack(">I", 5) + b"\0\0\0Talk" + bytes(1)
+
+    file_path = tmp_path / "speech.mp3"
+    file_path.write_bytes(id3_tag + frame_data * 1000)
+
+    probe_record = TagProbing().probe_file(str(file_path))
+
+    assert probe_record.title == "Talk"
+    assert (probe_record.duration, probe_record.sample_rate, probe_record.channels) == (26062, 44100, 1)
+    assert not probe_record.is_exact_duration
+
+
+def test_probe_mp3_file_reads_xing_frame_number(tmp_path: Path) -> None:
+    # the Xing header of a mono MPEG 1 Layer III frame follows 17 bytes of side information
+    xing_header = b"Xing" + struct.pack(">II", 1, 2000)
+    first_frame = bytes.fromhex("fffb90c0") + bytes(17) + xing_header + bytes(413 - 17 - len(xing_header))
+    frame_data = bytes.fromhex("fffb90c0") + bytes(413)
+
+    file_path = tmp_path / "speech.mp3"
+    file_path.write_bytes(first_frame + frame_data * 10)
+
+    probe_record = TagProbing().probe_file(str(file_path))
+
+    assert probe_record.duration == 2000 * 1152 * 1000 // 44100
+    assert probe_record.is_exact_duration
+
+
+def test_probe_mp3_file_without_frame_sync_is_unreadable(tmp_path: Path) -> None:
+    id3_tag = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 16]) + b"TIT2" + struct.pack(">I", 5) + b"\0\0\0Talk" + bytes(1)
+
+    file_path = tmp_path / "broken.mp3"
+    file_path.write_bytes(id3_tag + bytes(4096))
+
+    assert not TagProbing().probe_file(str(file_path)).is_readable
+
+
+def test_probe_mp3_file_finds_frame_after_long_padding(tmp_path: Path) -> None:
+    frame_data = bytes.fromhex("fffb90c0") + bytes(413)
+
+    file_path = tmp_path / "padded.mp3"
+    file_path.write_bytes(bytes(TagProbing.FRAME_SEARCH_BYTES + 4096) + frame_data * 1000)
+
+    probe_record = TagProbing().probe_file(str(file_path))
+
+    assert probe_record.is_readable
+    assert (probe_record.sample_rate, probe_record.channels) == (44100, 1)
+    assert probe_record.duration and not probe_record.is_exact_duration
+
+
+def test_probe_mp3_file_reads_id3v1_tag(tmp_path: Path) -> None:
+    frame_data = bytes.fromhex("fffb90c0") + bytes(413)
+    id3v1_tag = b"TAG" + b"Lecture".ljust(30, b"\0") + bytes(30 + 30 + 4 + 28) + bytes([0, 7, 0])
+
+    file_path = tmp_path / "lecture.mp3"
+    file_path.write_bytes(frame_data * 10 + id3v1_tag)
+
+    probe_record = TagProbing().probe_file(str(file_path))
+
+    assert probe_record.is_readable
+    assert (probe_record.title, probe_record.track) == ("Lecture", "7")